@@ -1,29 +1,189 @@
 import json
 import os
+import sys
 import uuid
+import zlib
+import time
+import hashlib
 import datetime
 import feedparser
-import boto3
+from botocore.exceptions import ClientError
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
+try:
+    import aws_clients
+except ImportError:
+    # Running from the repository rather than a built package
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+    import aws_clients
+
 # Environment variables
 STORAGE_TYPE = os.environ.get('STORAGE_TYPE', 'dynamodb')
 NEWS_BUCKET_NAME = os.environ.get('NEWS_BUCKET_NAME')
 NEWS_TABLE_NAME = os.environ.get('NEWS_TABLE_NAME')
+PENDING_SHARD_COUNT = int(os.environ.get('PENDING_SHARD_COUNT', '4'))  # Partitions of the sparse pending-work index
+S3_WRITE_CONCURRENCY = int(os.environ.get('S3_WRITE_CONCURRENCY', '8'))  # Parallel article uploads with STORAGE_TYPE=s3
+ARTICLE_QUEUE_URL = os.environ.get('ARTICLE_QUEUE_URL')  # Enables the SQS pipeline; 'local' uses an in-process queue
+
+# AWS services, created on first use and reused across warm invocations
+s3_client = aws_clients.lazy_client('s3', max_pool_connections=S3_WRITE_CONCURRENCY)
+dynamodb = aws_clients.lazy_resource('dynamodb')
+news_table = aws_clients.lazy_table(NEWS_TABLE_NAME) if STORAGE_TYPE == 'dynamodb' else None
 
-# Initialize AWS services
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-news_table = dynamodb.Table(NEWS_TABLE_NAME) if STORAGE_TYPE == 'dynamodb' else None
+FEED_REGISTRY_PATH = os.environ.get('FEED_REGISTRY_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feeds.json'))
+FEED_FETCH_CONCURRENCY = int(os.environ.get('FEED_FETCH_CONCURRENCY', '8'))  # Feeds downloaded in parallel
+FEED_INITIAL_ENTRIES = int(os.environ.get('FEED_INITIAL_ENTRIES', '10'))  # Entries taken from a feed with no watermark yet
+FEED_FETCH_TIMEOUT = float(os.environ.get('FEED_FETCH_TIMEOUT', '10'))  # Per-feed connect/read timeout in seconds
+UNPROCESSED_KEYS_MAX_BACKOFF = 2.0  # Longest wait in seconds before resending unprocessed BatchGetItem keys
 
 # AWS Recent Announcements RSS feed
 RSS_FEED_URL = "https://aws.amazon.com/about-aws/whats-new/recent/feed/"
+FEED_STATE_PREFIX = 'feed-state/'
+ARTICLES_PREFIX = 'articles/'
+PENDING_PREFIX = 'pending/'  # Empty markers for articles awaiting summarization
+
+class LocalArticleQueue:
+    """In-process stand-in for the SQS article queue
+
+    Accepts the same send_message_batch call as the SQS client and hands the
+    messages back as a Lambda SQS event, so the collector and processor can be
+    wired together locally without AWS.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def send_message_batch(self, QueueUrl, Entries):
+        for entry in Entries:
+            self.messages.append({
+                'messageId': str(uuid.uuid4()),
+                'body': entry['MessageBody'],
+                'eventSource': 'aws:sqs',
+                'eventSourceARN': QueueUrl
+            })
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': []}
+
+    def receive_event(self, batch_size=10):
+        """Remove up to `batch_size` messages and return them as an SQS event"""
+        records, self.messages = self.messages[:batch_size], self.messages[batch_size:]
+        return {'Records': records}
+
+if ARTICLE_QUEUE_URL == 'local':
+    sqs_client = LocalArticleQueue()
+elif ARTICLE_QUEUE_URL:
+    sqs_client = aws_clients.lazy_client('sqs')
+else:
+    sqs_client = None
+
+def load_feed_registry():
+    """Load the feeds to collect from the registry file
+
+    Falls back to the AWS Recent Announcements feed when no registry is deployed.
+    """
+    try:
+        with open(FEED_REGISTRY_PATH, encoding='utf-8') as f:
+            return json.load(f)['feeds']
+    except FileNotFoundError:
+        return [{'name': 'AWS Announcements', 'url': RSS_FEED_URL, 'language': 'en'}]
+
+# Registry of news sources, loaded once per container
+NEWS_SOURCES = load_feed_registry()
+
+def get_entry_guid(entry):
+    """Return the entry GUID, falling back to its link"""
+    return entry.get('id') or entry.link
+
+def get_entry_published(entry):
+    """Return the entry publication time as an ISO string, or None if the feed omits it"""
+    if entry.get('published_parsed'):
+        return datetime.datetime(*entry.published_parsed[:6]).isoformat()
+    return None
+
+def get_article_id(entry):
+    """Derive a stable article ID from the entry GUID (or link if there is none)
+
+    The same announcement always maps to the same ID, so collecting it again
+    on a later run is a no-op instead of a new unprocessed item.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, get_entry_guid(entry)))
+
+def select_new_entries(entries, feed_state):
+    """Return the entries published after the feed's high watermark
+
+    Entries published exactly at the watermark are new unless their GUID was
+    already seen, and entries without a publication date are always passed on
+    (the existence check when saving drops them if they were stored before).
+    Without a watermark only the latest FEED_INITIAL_ENTRIES are taken.
+    """
+    watermark = feed_state.get('watermark')
+    if not watermark:
+        return entries[:FEED_INITIAL_ENTRIES]
+
+    seen_guids = set(feed_state.get('seen_guids', []))
+    new_entries = []
+    for entry in entries:
+        published = get_entry_published(entry)
+        if published is None or published > watermark:
+            new_entries.append(entry)
+        elif published == watermark and get_entry_guid(entry) not in seen_guids:
+            new_entries.append(entry)
+
+    return new_entries
+
+def advance_watermark(feed_state, entries):
+    """Move the feed's watermark to the newest publication time in `entries`"""
+    published_guids = [
+        (get_entry_published(entry), get_entry_guid(entry))
+        for entry in entries if get_entry_published(entry) is not None
+    ]
+    if not published_guids:
+        return
+
+    latest = max(published for published, _ in published_guids)
+    latest_guids = {guid for published, guid in published_guids if published == latest}
+    if latest == feed_state.get('watermark'):
+        latest_guids.update(feed_state.get('seen_guids', []))
+
+    feed_state['watermark'] = latest
+    feed_state['seen_guids'] = sorted(latest_guids)
+
+def article_exists_in_s3(s3_key):
+    """Check whether an article object already exists in S3"""
+    try:
+        s3_client.head_object(Bucket=NEWS_BUCKET_NAME, Key=s3_key)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code', '') in ['404', 'NoSuchKey', 'NotFound']:
+            return False
+        raise
 
 def save_article_to_s3(article_data):
-    """Save article data to S3"""
+    """Save article data to S3 unless it was already collected
+
+    An empty marker with the same relative key is written under the pending
+    prefix first, so the processor can list the backlog without reading every
+    stored article. Returns True when stored, False when already collected and
+    None on error.
+    """
     try:
         article_id = article_data['id']
-        s3_key = f"articles/{article_data['source']}/{article_id}.json"
+        relative_key = f"{article_data['source']}/{article_id}.json"
+        s3_key = f"{ARTICLES_PREFIX}{relative_key}"
+
+        if article_exists_in_s3(s3_key):
+            print(f"Article already collected: {article_data['title']}")
+            return False
+
+        # Marker first: a marker without its article is skipped by the processor,
+        # while an article without a marker would never be processed
+        s3_client.put_object(
+            Bucket=NEWS_BUCKET_NAME,
+            Key=f"{PENDING_PREFIX}{relative_key}",
+            Body=b''
+        )
 
         s3_client.put_object(
             Bucket=NEWS_BUCKET_NAME,
@@ -35,68 +195,336 @@ def save_article_to_s3(article_data):
         return True
     except Exception as e:
         print(f"Error saving to S3: {str(e)}")
-        return False
+        return None
+
+def save_articles_to_s3(articles):
+    """Save articles to S3 with concurrent puts, returning one status per article
+
+    Object keys include the source, so an entry that appears in more than one
+    feed is only saved for the first; the copies get the "already collected"
+    status.
+    """
+    first_positions = {}
+    for position, article_data in enumerate(articles):
+        first_positions.setdefault(article_data['id'], position)
+    unique_positions = sorted(first_positions.values())
+
+    with ThreadPoolExecutor(max_workers=max(1, S3_WRITE_CONCURRENCY)) as executor:
+        unique_statuses = dict(zip(
+            unique_positions,
+            executor.map(save_article_to_s3, [articles[position] for position in unique_positions])
+        ))
+
+    statuses = []
+    for position, article_data in enumerate(articles):
+        if position in unique_statuses:
+            statuses.append(unique_statuses[position])
+        else:
+            print(f"Article already collected: {article_data['title']}")
+            # A copy of an entry that failed to save stays an error, so the watermark is held back
+            statuses.append(None if unique_statuses[first_positions[article_data['id']]] is None else False)
+    return statuses
+
+def get_pending_shard(article_id):
+    """Return the pending-index partition for an article.
+
+    Unprocessed items carry a 'pending_shard' attribute that is the hash key of
+    the sparse pending GSI; the processor removes it once the item is summarized,
+    so the index only ever holds the backlog. Spreading items over a few shards
+    keeps a single partition from getting hot on busy days.
+    """
+    return str(zlib.crc32(article_id.encode('utf-8')) % PENDING_SHARD_COUNT)
+
+def get_existing_article_ids_from_dynamodb(article_ids):
+    """Return the subset of article IDs already stored in DynamoDB
+
+    BatchWriteItem cannot carry a condition, so existing articles are looked up
+    up front (100 keys per BatchGetItem, retrying unprocessed keys with
+    backoff) and left out of the write. BatchGetItem rejects duplicate keys,
+    and the same entry may appear in more than one feed, so IDs are
+    de-duplicated first.
+    """
+    existing_ids = set()
+    article_ids = list(dict.fromkeys(article_ids))
+
+    for i in range(0, len(article_ids), 100):
+        request_items = {
+            NEWS_TABLE_NAME: {
+                'Keys': [{'id': article_id} for article_id in article_ids[i:i+100]],
+                'ProjectionExpression': 'id'
+            }
+        }
+
+        attempt = 0
+        while request_items:
+            if attempt:
+                # Unprocessed keys mean the table is throttling; back off before resending
+                time.sleep(min(0.05 * 2 ** attempt, UNPROCESSED_KEYS_MAX_BACKOFF))
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(NEWS_TABLE_NAME, []):
+                existing_ids.add(item['id'])
+            request_items = response.get('UnprocessedKeys')
+            attempt += 1
+
+    return existing_ids
 
-def save_article_to_dynamodb(article_data):
-    """Save article data to DynamoDB"""
+def save_articles_to_dynamodb(articles):
+    """Save articles to DynamoDB in batches, skipping ones already collected
+
+    Returns one status per article: True when stored, False when already
+    collected and None on error.
+    """
     try:
-        news_table.put_item(Item=article_data)
-        return True
+        existing_ids = get_existing_article_ids_from_dynamodb([article['id'] for article in articles])
+    except Exception as e:
+        print(f"Error checking existing articles in DynamoDB: {str(e)}")
+        return [None] * len(articles)
+
+    statuses = []
+    new_articles = []
+    for article_data in articles:
+        if article_data['id'] in existing_ids:
+            print(f"Article already collected: {article_data['title']}")
+            statuses.append(False)
+        else:
+            statuses.append(True)
+            new_articles.append(article_data)
+            # The same entry may appear in more than one feed
+            existing_ids.add(article_data['id'])
+
+    try:
+        # batch_writer sends 25-item BatchWriteItem requests and resends any
+        # unprocessed items until they are written
+        with news_table.batch_writer(overwrite_by_pkeys=['id']) as batch:
+            for article_data in new_articles:
+                item = dict(article_data)
+                item['pending_shard'] = get_pending_shard(item['id'])
+                batch.put_item(Item=item)
     except Exception as e:
         print(f"Error saving to DynamoDB: {str(e)}")
+        return [None if is_new else is_new for is_new in statuses]
+
+    return statuses
+
+def get_feed_state_key(feed_url):
+    """Return the storage key for a feed's persisted state"""
+    if STORAGE_TYPE == 's3':
+        return f"{FEED_STATE_PREFIX}{hashlib.sha256(feed_url.encode('utf-8')).hexdigest()}.json"
+    return f"feed-state#{feed_url}"
+
+def load_feed_state(feed_url):
+    """Load the persisted state (HTTP validators and watermark) for a feed"""
+    try:
+        state_key = get_feed_state_key(feed_url)
+        if STORAGE_TYPE == 's3':
+            try:
+                response = s3_client.get_object(Bucket=NEWS_BUCKET_NAME, Key=state_key)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code', '') in ['404', 'NoSuchKey']:
+                    return {}
+                raise
+            return json.loads(response['Body'].read().decode('utf-8'))
+
+        response = news_table.get_item(Key={'id': state_key})
+        return response.get('Item', {})
+    except Exception as e:
+        print(f"Error loading feed state for {feed_url}: {str(e)}")
+        return {}
+
+def save_feed_state(feed_url, state):
+    """Persist the state (HTTP validators and watermark) for a feed"""
+    try:
+        state_key = get_feed_state_key(feed_url)
+        item = {k: v for k, v in state.items() if v is not None}
+        item.update({
+            'id': state_key,
+            'record_type': 'feed_state',
+            'feed_url': feed_url,
+            'updated_at': datetime.datetime.now().isoformat()
+        })
+
+        if STORAGE_TYPE == 's3':
+            s3_client.put_object(
+                Bucket=NEWS_BUCKET_NAME,
+                Key=state_key,
+                Body=json.dumps(item, ensure_ascii=False),
+                ContentType='application/json'
+            )
+        else:
+            news_table.put_item(Item=item)
+
+        return True
+    except Exception as e:
+        print(f"Error saving feed state for {feed_url}: {str(e)}")
         return False
 
-def collect_articles():
-    """Collect articles from AWS RSS feed"""
-    collected_articles = []
+def fetch_feed(feed_url, feed_state):
+    """Fetch and parse a feed with a conditional GET using the stored validators
+
+    Returns (feed, validators), or (None, None) when the server answers 304
+    Not Modified. The download is done here rather than by feedparser so that
+    every feed gets its own timeout.
+    """
+    headers = {'User-Agent': 'news-ai-summarizer'}
+    if feed_state.get('etag'):
+        headers['If-None-Match'] = feed_state['etag']
+    if feed_state.get('modified'):
+        headers['If-Modified-Since'] = feed_state['modified']
 
+    req = urllib.request.Request(feed_url, headers=headers)
     try:
-        # Parse RSS feed
-        feed = feedparser.parse(RSS_FEED_URL)
-
-        # Process each entry
-        for entry in feed.entries[:10]:  # Get the latest 10 articles
-            # Generate unique ID
-            article_id = str(uuid.uuid4())
-
-            # Get publication date
-            if hasattr(entry, 'published_parsed'):
-                pub_date = datetime.datetime(*entry.published_parsed[:6]).isoformat()
-            else:
-                pub_date = datetime.datetime.now().isoformat()
-
-            # Extract domain from the link
-            domain = urlparse(entry.link).netloc
-
-            # Create article data
-            article_data = {
-                'id': article_id,
-                'title': entry.title,
-                'link': entry.link,
-                'published_date': pub_date,
-                'source': 'AWS Announcements',
-                'language': 'en',
-                'domain': domain,
-                'summary': entry.description if hasattr(entry, 'description') else "",
-                'content': entry.description if hasattr(entry, 'description') else "",
-                'processed': False,
-                'created_at': datetime.datetime.now().isoformat()
+        with urllib.request.urlopen(req, timeout=FEED_FETCH_TIMEOUT) as response:
+            body = response.read()
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'modified': response.headers.get('Last-Modified')
             }
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, None
+        raise
 
-            # Save article according to storage type
-            if STORAGE_TYPE == 's3':
-                save_article_to_s3(article_data)
-            else:
-                save_article_to_dynamodb(article_data)
+    return feedparser.parse(body), validators
 
-            collected_articles.append({
-                'id': article_id,
-                'title': entry.title,
-                'source': 'AWS Announcements'
-            })
+def fetch_feeds(feeds, feed_states):
+    """Fetch all feeds concurrently with a bounded pool
 
-    except Exception as e:
-        print(f"Error processing AWS Announcements feed: {str(e)}")
+    Returns a dict of feed name to (feed, validators); feeds that failed to
+    download are left out.
+    """
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, FEED_FETCH_CONCURRENCY)) as executor:
+        future_to_name = {
+            executor.submit(fetch_feed, feed_config['url'], feed_states[feed_config['name']]): feed_config['name']
+            for feed_config in feeds
+        }
+
+        for future in as_completed(future_to_name):
+            name = future_to_name[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Error fetching {name} feed: {str(e)}")
+
+    return results
+
+def build_article(feed_config, entry):
+    """Build the stored article record for a feed entry"""
+    # Get publication date
+    pub_date = get_entry_published(entry) or datetime.datetime.now().isoformat()
+
+    # Extract domain from the link
+    domain = urlparse(entry.link).netloc
+
+    return {
+        # Derive a stable ID so re-collection is idempotent
+        'id': get_article_id(entry),
+        'title': entry.title,
+        'link': entry.link,
+        'published_date': pub_date,
+        'source': feed_config['name'],
+        'language': feed_config.get('language', 'en'),
+        'domain': domain,
+        'summary': entry.description if hasattr(entry, 'description') else "",
+        'content': entry.description if hasattr(entry, 'description') else "",
+        'processed': False,
+        'created_at': datetime.datetime.now().isoformat()
+    }
+
+def enqueue_articles(articles):
+    """Send collected article IDs to the processing queue, 10 per SendMessageBatch"""
+    for i in range(0, len(articles), 10):
+        batch = articles[i:i+10]
+        try:
+            response = sqs_client.send_message_batch(
+                QueueUrl=ARTICLE_QUEUE_URL,
+                Entries=[
+                    {
+                        'Id': str(index),
+                        'MessageBody': json.dumps({'id': article['id'], 'source': article['source']}, ensure_ascii=False)
+                    }
+                    for index, article in enumerate(batch)
+                ]
+            )
+            for failure in response.get('Failed', []):
+                # The article stays pending and is still picked up by the scheduled processor
+                print(f"Error enqueueing article {batch[int(failure['Id'])]['id']}: {failure.get('Message')}")
+        except Exception as e:
+            print(f"Error enqueueing articles: {str(e)}")
+
+def save_articles(articles):
+    """Save articles according to storage type, returning one status per article"""
+    if not articles:
+        return []
+    if STORAGE_TYPE == 's3':
+        return save_articles_to_s3(articles)
+    return save_articles_to_dynamodb(articles)
+
+def collect_articles():
+    """Collect articles from every feed in the registry"""
+    collected_articles = []
+
+    # Downloads run in parallel; state reads and article writes stay on this
+    # thread because boto3 resources (the DynamoDB table) are not thread-safe
+    feed_states = {feed_config['name']: load_feed_state(feed_config['url']) for feed_config in NEWS_SOURCES}
+    fetched_feeds = fetch_feeds(NEWS_SOURCES, feed_states)
+
+    # Gather the new entries of every changed feed so they are written together
+    pending_feeds = []
+    articles = []
+    for feed_config in NEWS_SOURCES:
+        name = feed_config['name']
+        if name not in fetched_feeds:
+            continue
+
+        feed, validators = fetched_feeds[name]
+        if feed is None:
+            print(f"Feed not modified since last run: {name}")
+            continue
+
+        try:
+            # Process only the entries published since the last run
+            new_entries = select_new_entries(feed.entries, feed_states[name])
+            print(f"{name}: {len(new_entries)} new of {len(feed.entries)} feed entries")
+
+            feed_articles = [build_article(feed_config, entry) for entry in new_entries]
+        except Exception as e:
+            print(f"Error processing {name} feed: {str(e)}")
+            continue
+
+        pending_feeds.append((feed_config, validators, new_entries, len(articles), len(feed_articles)))
+        articles.extend(feed_articles)
+
+    statuses = save_articles(articles)
+
+    for feed_config, validators, new_entries, offset, count in pending_feeds:
+        feed_statuses = statuses[offset:offset + count]
+        feed_state = feed_states[feed_config['name']]
+
+        # Only newly stored articles count as collected
+        for article, is_new in zip(articles[offset:offset + count], feed_statuses):
+            if is_new:
+                collected_articles.append({
+                    'id': article['id'],
+                    'title': article['title'],
+                    'source': article['source']
+                })
+
+        # Advance the watermark and remember the validators only when every new
+        # entry was stored. Otherwise the validators are cleared so the next
+        # run downloads the feed again instead of getting a 304, and the failed
+        # entries are picked up again
+        if all(is_new is not None for is_new in feed_statuses):
+            advance_watermark(feed_state, new_entries)
+            feed_state.update(validators)
+        else:
+            feed_state.update({'etag': None, 'modified': None})
+        save_feed_state(feed_config['url'], feed_state)
+
+    # Fan the new articles out to the processor when the queue pipeline is enabled
+    if sqs_client and collected_articles:
+        enqueue_articles(collected_articles)
 
     return collected_articles
 
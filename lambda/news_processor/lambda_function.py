@@ -1,14 +1,26 @@
 import json
 import os
-import boto3
+import sys
 import datetime
 import uuid
-import urllib.request
-import urllib.parse
 import time
-import random
+import threading
+import hashlib
+import re
+import string
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from botocore.exceptions import ClientError
 
+try:
+    import aws_clients
+    import slack_client
+except ImportError:
+    # Running from the repository rather than a built package
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+    import aws_clients
+    import slack_client
+
 # Environment variables
 STORAGE_TYPE = os.environ.get('STORAGE_TYPE', 'dynamodb')
 NEWS_BUCKET_NAME = os.environ.get('NEWS_BUCKET_NAME')
@@ -18,184 +30,804 @@ SLACK_WEBHOOK_URL = os.environ.get('SLACK_WEBHOOK_URL')
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN')
 OUTPUT_LANGUAGE = os.environ.get('OUTPUT_LANGUAGE', 'ja')  # Default to Japanese, can be set to 'en' for English
 MAX_RETRIES = int(os.environ.get('MAX_RETRIES', '8'))  # Increase the number of retries
-BATCH_SIZE = int(os.environ.get('BATCH_SIZE', '1'))  # Limit the number of articles processed at once
+MAX_CONCURRENCY = int(os.environ.get('MAX_CONCURRENCY', '4'))  # Maximum number of in-flight Bedrock calls
+BEDROCK_INITIAL_RATE = float(os.environ.get('BEDROCK_INITIAL_RATE', '1.0'))  # Bedrock requests per second at start
+BEDROCK_MIN_RATE = float(os.environ.get('BEDROCK_MIN_RATE', '0.05'))
+BEDROCK_MAX_RATE = float(os.environ.get('BEDROCK_MAX_RATE', '10.0'))
+BEDROCK_RATE_INCREASE = float(os.environ.get('BEDROCK_RATE_INCREASE', '0.1'))  # Added to the rate after each success
+BEDROCK_STREAMING = os.environ.get('BEDROCK_STREAMING', 'false').lower() == 'true'  # Use invoke_model_with_response_stream
+BATCH_PROMPT_SIZE = int(os.environ.get('BATCH_PROMPT_SIZE', '1'))  # Announcements packed into one Bedrock request (1 disables batching)
+BATCH_PROMPT_MAX_CONTENT_CHARS = int(os.environ.get('BATCH_PROMPT_MAX_CONTENT_CHARS', '2000'))  # Longer articles are summarized alone
+BATCH_PROMPT_MAX_TOKENS = int(os.environ.get('BATCH_PROMPT_MAX_TOKENS', '8000'))
+BATCH_PROMPT_TOKENS_PER_ARTICLE = 1000  # Output tokens budgeted for each announcement in a batch prompt
+# Larger groups would not fit their answers into BATCH_PROMPT_MAX_TOKENS
+BATCH_GROUP_SIZE = max(1, min(BATCH_PROMPT_SIZE, BATCH_PROMPT_MAX_TOKENS // BATCH_PROMPT_TOKENS_PER_ARTICLE))
+MAX_INPUT_TOKENS = int(os.environ.get('MAX_INPUT_TOKENS', '6000'))  # Estimated input-token ceiling per single-article prompt
+PROMPT_CACHING = os.environ.get('PROMPT_CACHING', 'auto').lower()  # 'auto' (supported models only), 'true' or 'false'
+# Model id fragments with Bedrock prompt caching, and the minimum cacheable prefix of each in tokens
+PROMPT_CACHING_MODELS = {'claude-3-7-sonnet': 1024, 'claude-3-5-haiku': 2048, 'claude-sonnet-4': 1024, 'claude-opus-4': 1024, 'claude-haiku-4': 4096}
+NOTIFICATION_MODE = os.environ.get('NOTIFICATION_MODE', 'digest')  # 'digest' (one notification per run) or 'streaming'
+NOTIFICATION_FLUSH_COUNT = int(os.environ.get('NOTIFICATION_FLUSH_COUNT', '5'))  # Streaming: send once this many summaries are ready
+NOTIFICATION_FLUSH_SECONDS = float(os.environ.get('NOTIFICATION_FLUSH_SECONDS', '20'))  # Streaming: longest a ready summary waits
+MAX_SUMMARY_CHARS = int(os.environ.get('MAX_SUMMARY_CHARS', '2900'))  # Streamed summaries stop here (Slack truncates at 2900)
+THROTTLING_ERROR_CODES = ["ThrottlingException", "ServiceQuotaExceeded", "TooManyRequestsException"]
+TIME_BUDGET_RESERVE_MS = int(os.environ.get('TIME_BUDGET_RESERVE_MS', '90000'))  # Stop starting new articles with less time than this left
+WORK_DEADLINE_RESERVE_MS = int(os.environ.get('WORK_DEADLINE_RESERVE_MS', '30000'))  # Abandon in-flight Bedrock work with less time than this left
+MAX_CONTINUATIONS = int(os.environ.get('MAX_CONTINUATIONS', '10'))  # Self re-invocations allowed per run
+PENDING_MIN_AGE_SECONDS = int(os.environ.get('PENDING_MIN_AGE_SECONDS', '0'))  # Scheduled runs skip newer articles (left to the SQS pipeline)
+PENDING_INDEX_NAME = os.environ.get('PENDING_INDEX_NAME', 'pending_shard-published_date-index')
+PENDING_SHARD_COUNT = int(os.environ.get('PENDING_SHARD_COUNT', '4'))  # Must match the collector setting
+SUMMARY_CACHE_TABLE_NAME = os.environ.get('SUMMARY_CACHE_TABLE_NAME')
+SUMMARY_CACHE_SIZE = int(os.environ.get('SUMMARY_CACHE_SIZE', '256'))  # Entries kept in the in-memory LRU
+SUMMARY_CACHE_PREFIX = 'summary-cache/'
+ARTICLES_PREFIX = 'articles/'
+PROCESSING_MODE = os.environ.get('PROCESSING_MODE', 'on_demand')  # 'on_demand' or 'batch_job' (Bedrock batch inference)
+BATCH_JOB_RUNNER = os.environ.get('BATCH_JOB_RUNNER', 's3')  # 's3' for Bedrock, 'local' for the file-based stand-in
+BATCH_JOB_LOCAL_DIR = os.environ.get('BATCH_JOB_LOCAL_DIR', '/tmp/news-batch-jobs')
+BATCH_JOB_ROLE_ARN = os.environ.get('BATCH_JOB_ROLE_ARN')  # Service role Bedrock assumes to read/write the job files
+BATCH_JOB_MIN_RECORDS = int(os.environ.get('BATCH_JOB_MIN_RECORDS', '100'))  # Bedrock's minimum job size
+BATCH_JOB_PREFIX = 'batch-inference/'
+BATCH_JOB_RUNNING_STATUSES = ['Submitted', 'Validating', 'Scheduled', 'InProgress', 'Stopping']
+PENDING_PREFIX = 'pending/'  # Empty markers written by the collector for new articles
+SNS_MESSAGE_BYTES_LIMIT = int(os.environ.get('SNS_MESSAGE_BYTES_LIMIT', '250000'))  # Headroom below SNS's 256 KB message limit
+SNS_CLAIM_CHECK = os.environ.get('SNS_CLAIM_CHECK', 'auto')  # 'auto' (oversized digests only), 'always' or 'never'
+CLAIM_CHECK_STORAGE = os.environ.get('CLAIM_CHECK_STORAGE', 's3')  # 's3' or 'local' (files under CLAIM_CHECK_LOCAL_DIR)
+CLAIM_CHECK_LOCAL_DIR = os.environ.get('CLAIM_CHECK_LOCAL_DIR', '/tmp/news-notifications')
+NOTIFICATIONS_PREFIX = 'notifications/'  # Claim-checked SNS digests
+PROMPT_TEMPLATES_PATH = os.environ.get('PROMPT_TEMPLATES_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prompt_templates.json'))
+
+# AWS services, created on first use and reused across warm invocations
+bedrock_runtime = aws_clients.lazy_client('bedrock-runtime', max_pool_connections=MAX_CONCURRENCY)
+bedrock_client = aws_clients.lazy_client('bedrock')
+s3_client = aws_clients.lazy_client('s3', max_pool_connections=MAX_CONCURRENCY)
+sns_client = aws_clients.lazy_client('sns')
+lambda_client = aws_clients.lazy_client('lambda')
+news_table = aws_clients.lazy_table(NEWS_TABLE_NAME) if STORAGE_TYPE == 'dynamodb' else None
+summary_cache_table = aws_clients.lazy_table(SUMMARY_CACHE_TABLE_NAME) if STORAGE_TYPE == 'dynamodb' and SUMMARY_CACHE_TABLE_NAME else None
+
+def load_prompt_templates(model_id):
+    """Load and compile the prompt templates for a model from the template registry
+
+    The registry file holds a version (part of the summary cache key, so bump
+    it whenever a template changes) and template sets keyed by model id
+    fragment. The 'default' set applies to every model; a set whose key
+    appears in the model id overrides individual templates. Templates use
+    string.Template placeholders such as $title and $content.
+    """
+    with open(PROMPT_TEMPLATES_PATH, encoding='utf-8') as f:
+        registry = json.load(f)
+
+    templates = {kind: dict(languages) for kind, languages in registry['templates']['default'].items()}
+    for key, overrides in registry['templates'].items():
+        if key != 'default' and key in model_id.lower():
+            for kind, languages in overrides.items():
+                templates.setdefault(kind, {}).update(languages)
+
+    compiled = {
+        kind: {language: string.Template(text) for language, text in languages.items()}
+        for kind, languages in templates.items()
+    }
+    return registry['version'], compiled
+
+def get_prompt_template(kind, language):
+    """Return the compiled template of a kind for a language, falling back to English"""
+    templates = PROMPT_TEMPLATES[kind]
+    return templates.get(language) or templates['en']
+
+# Prompt templates and model family are resolved once per container
+PROMPT_TEMPLATE_VERSION, PROMPT_TEMPLATES = load_prompt_templates(BEDROCK_MODEL_ID)
+MODEL_FAMILY = 'claude' if 'claude' in BEDROCK_MODEL_ID.lower() else 'default'
+
+# Prompt cache usage reported by Bedrock, for the per-run hit rate
+prompt_cache_lock = threading.Lock()
+prompt_cache_stats = {'requests': 0, 'cache_hits': 0, 'cache_read_tokens': 0, 'cache_write_tokens': 0, 'input_tokens': 0}
+
+# Content trimming for the input-token budget
+CONTENT_PLACEHOLDER = '\x00ARTICLE_CONTENT\x00'
+PARAGRAPH_SPLIT_PATTERN = re.compile(r'\n\s*\n|</p>|<br\s*/?>', re.IGNORECASE)
+PRIORITY_SECTION_PATTERN = re.compile(r'pric|cost|\$|region|available in|料金|価格|リージョン', re.IGNORECASE)
+content_budget_lock = threading.Lock()
+content_budget_stats = {'articles_trimmed': 0, 'tokens_trimmed': 0}
+
+# In-memory LRU front for the persistent summary cache, reused across warm invocations
+summary_cache_lru = OrderedDict()
+
+def iter_pending_articles_from_dynamodb():
+    """Yield unprocessed articles by querying the sparse pending index.
+
+    Only items that still carry a 'pending_shard' attribute are present in the
+    index, so each query reads the backlog rather than the whole table. Every
+    shard is followed through LastEvaluatedKey until it is exhausted.
+    """
+    for shard in range(PENDING_SHARD_COUNT):
+        query_kwargs = {
+            'IndexName': PENDING_INDEX_NAME,
+            'KeyConditionExpression': '#shard = :shard_val',
+            'ExpressionAttributeNames': {
+                '#shard': 'pending_shard'
+            },
+            'ExpressionAttributeValues': {
+                ':shard_val': str(shard)
+            }
+        }
+
+        while True:
+            response = news_table.query(**query_kwargs)
+
+            for item in response.get('Items', []):
+                yield item
 
-# Initialize AWS services
-bedrock_runtime = boto3.client('bedrock-runtime')
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-sns_client = boto3.client('sns')
-news_table = dynamodb.Table(NEWS_TABLE_NAME) if STORAGE_TYPE == 'dynamodb' else None
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            query_kwargs['ExclusiveStartKey'] = last_key
 
 def get_unprocessed_articles_from_dynamodb():
     """Get unprocessed articles from DynamoDB"""
     try:
-        response = news_table.scan(
-            FilterExpression='#proc = :processed_val AND #src = :source_val',
-            ExpressionAttributeNames={
-                '#proc': 'processed',
-                '#src': 'source'
-            },
-            ExpressionAttributeValues={
-                ':processed_val': False,
-                ':source_val': 'AWS Announcements'
-            }
-        )
-
-        return response.get('Items', [])
+        return list(iter_pending_articles_from_dynamodb())
     except Exception as e:
         print(f"Error getting articles from DynamoDB: {str(e)}")
         return []
 
+def select_stale_articles(articles):
+    """Drop articles collected less than PENDING_MIN_AGE_SECONDS ago
+
+    With the SQS pipeline enabled, recent articles are still being summarized
+    from the queue, so scheduled runs only pick up what the queue left behind.
+    Articles without a creation time count as stale.
+    """
+    if PENDING_MIN_AGE_SECONDS <= 0:
+        return articles
+
+    cutoff = (datetime.datetime.now() - datetime.timedelta(seconds=PENDING_MIN_AGE_SECONDS)).isoformat()
+    stale_articles = [article for article in articles if article.get('created_at', '') <= cutoff]
+    if len(stale_articles) < len(articles):
+        print(f"Leaving {len(articles) - len(stale_articles)} articles newer than {PENDING_MIN_AGE_SECONDS} seconds to the queue")
+    return stale_articles
+
 def get_unprocessed_articles_from_s3():
-    """Get unprocessed articles from S3"""
+    """Get unprocessed articles from S3
+
+    The collector writes an empty marker under the pending prefix for every new
+    article, so only the backlog is listed and read.
+    """
     try:
         articles = []
 
-        # List objects in the bucket with prefix
+        # List pending markers for every source in the bucket
         paginator = s3_client.get_paginator('list_objects_v2')
-        pages = paginator.paginate(Bucket=NEWS_BUCKET_NAME, Prefix='articles/AWS Announcements/')
+        pages = paginator.paginate(Bucket=NEWS_BUCKET_NAME, Prefix=PENDING_PREFIX)
 
         for page in pages:
-            if 'Contents' in page:
-                for obj in page['Contents']:
-                    # Get object content
-                    response = s3_client.get_object(Bucket=NEWS_BUCKET_NAME, Key=obj['Key'])
-                    article_data = json.loads(response['Body'].read().decode('utf-8'))
-
-                    # Check if article is unprocessed
-                    if not article_data.get('processed', False):
-                        articles.append(article_data)
+            for obj in page.get('Contents', []):
+                marker_key = obj['Key']
+                article_key = ARTICLES_PREFIX + marker_key[len(PENDING_PREFIX):]
+
+                # Get article content
+                try:
+                    response = s3_client.get_object(Bucket=NEWS_BUCKET_NAME, Key=article_key)
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code', '') in ['NoSuchKey', '404']:
+                        # The collector failed after writing the marker
+                        print(f"Skipping pending marker without article: {marker_key}")
+                        continue
+                    raise
+                article_data = json.loads(response['Body'].read().decode('utf-8'))
+
+                # Check if article is unprocessed
+                if not article_data.get('processed', False):
+                    articles.append(article_data)
+                else:
+                    delete_pending_marker_in_s3(article_data)
 
         return articles
     except Exception as e:
         print(f"Error getting articles from S3: {str(e)}")
         return []
 
-def summarize_article_with_bedrock(article_data, language='en'):
-    """Summarize article using Bedrock with optional translation and robust retry mechanism"""
-    # Initialize retry counter
-    retry_count = 0
-    base_delay = 1  # Base delay in seconds
+def delete_pending_marker_in_s3(article_data):
+    """Remove an article's pending marker once it has been processed"""
+    s3_client.delete_object(
+        Bucket=NEWS_BUCKET_NAME,
+        Key=f"{PENDING_PREFIX}{article_data['source']}/{article_data['id']}.json"
+    )
+
+def get_summary_cache_key(article_data, language):
+    """Build the summary cache key from the normalized article and prompt settings.
+
+    Whitespace is collapsed so cosmetic feed changes still hit the cache, and the
+    model id, output language and prompt version are part of the key so changing
+    any of them produces fresh summaries. The link is included because the
+    summary ends with it.
+    """
+    title = ' '.join(article_data.get('title', '').split())
+    content = ' '.join(article_data.get('content', '').split())
+    link = article_data.get('link', '').strip()
+    key_material = '\n'.join([title, content, link, BEDROCK_MODEL_ID, language, PROMPT_TEMPLATE_VERSION])
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+def is_cacheable_summary(summary):
+    """Only real model output is cached, never error or placeholder text"""
+    return bool(summary) and not summary.startswith('Error generating summary') \
+        and summary != "No content available for summarization."
+
+def get_cached_summary_from_dynamodb(cache_key):
+    """Get a cached summary from the DynamoDB summary cache table"""
+    if not summary_cache_table:
+        return None
+    response = summary_cache_table.get_item(Key={'cache_key': cache_key})
+    return response.get('Item', {}).get('summary')
+
+def get_cached_summary_from_s3(cache_key):
+    """Get a cached summary from the S3 summary cache prefix"""
+    try:
+        response = s3_client.get_object(Bucket=NEWS_BUCKET_NAME, Key=f"{SUMMARY_CACHE_PREFIX}{cache_key}.json")
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code', '') in ['NoSuchKey', '404']:
+            return None
+        raise
+    return json.loads(response['Body'].read().decode('utf-8')).get('summary')
+
+def get_cached_summary(cache_key):
+    """Look up a summary in the in-memory LRU, then in persistent storage"""
+    if cache_key in summary_cache_lru:
+        summary_cache_lru.move_to_end(cache_key)
+        return summary_cache_lru[cache_key]
 
-    while retry_count <= MAX_RETRIES:
-        try:
-            # Prepare content for summarization
-            content = article_data.get('content', '')
-            title = article_data.get('title', '')
-            source = article_data.get('source', '')
-            link = article_data.get('link', '')
-
-            # Skip if no content
-            if not content:
-                return "No content available for summarization."
-
-            # Prepare prompt based on requested output language
-            if language == 'ja':
-                prompt = f"""Article Title: {title}
-Source: {source}
-Link: {link}
-
-Article Content:
-{content}
-
-This is an AWS announcement. Please provide a detailed analysis of this AWS service or feature announcement in Japanese.
-Please explain the following aspects in depth:
-1. Overview and purpose of the announced service or feature
-2. Main capabilities, features, and specific benefits they bring to businesses and developers
-3. Available regions and deployment plans
-4. Detailed pricing structure and cost information
-5. Case studies or recommended usage scenarios (if mentioned)
-
-Please structure your response in paragraphs rather than bullet points, providing detailed explanations for each topic. Include technical characteristics and advantages specifically, offering as comprehensive information as possible.
-At the end, please include the following URL for reference: {link}"""
-            else:
-                prompt = f"""Article Title: {title}
-Source: {source}
-Link: {link}
-
-Article Content:
-{content}
-
-This is an AWS announcement. Please provide a comprehensive analysis of this AWS service or feature announcement in detail.
-Please explain the following aspects in depth:
-1. Overview and purpose of the announced service or feature
-2. Main capabilities, features, and specific benefits they bring to businesses and developers
-3. Available regions and deployment plans
-4. Detailed pricing structure and cost information
-5. Case studies or recommended usage scenarios (if mentioned)
-
-Please structure your response in paragraphs rather than bullet points, providing detailed explanations for each topic. Include technical characteristics and advantages specifically, offering as comprehensive information as possible.
-At the end, please include the following URL for reference: {link}"""
-
-            # Prepare request body based on model
-            if "claude" in BEDROCK_MODEL_ID.lower():
-                request_body = {
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1000,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                }
+    try:
+        if STORAGE_TYPE == 's3':
+            summary = get_cached_summary_from_s3(cache_key)
+        else:
+            summary = get_cached_summary_from_dynamodb(cache_key)
+    except Exception as e:
+        print(f"Error reading summary cache: {str(e)}")
+        return None
+
+    if summary:
+        remember_summary(cache_key, summary)
+    return summary
+
+def remember_summary(cache_key, summary):
+    """Add a summary to the in-memory LRU, evicting the least recently used"""
+    summary_cache_lru[cache_key] = summary
+    summary_cache_lru.move_to_end(cache_key)
+    while len(summary_cache_lru) > SUMMARY_CACHE_SIZE:
+        summary_cache_lru.popitem(last=False)
+
+def save_summary_to_cache(cache_key, summary):
+    """Save a summary to the in-memory LRU and persistent storage"""
+    remember_summary(cache_key, summary)
+
+    try:
+        cache_entry = {
+            'cache_key': cache_key,
+            'summary': summary,
+            'model_id': BEDROCK_MODEL_ID,
+            'prompt_version': PROMPT_TEMPLATE_VERSION,
+            'created_at': datetime.datetime.now().isoformat()
+        }
+
+        if STORAGE_TYPE == 's3':
+            s3_client.put_object(
+                Bucket=NEWS_BUCKET_NAME,
+                Key=f"{SUMMARY_CACHE_PREFIX}{cache_key}.json",
+                Body=json.dumps(cache_entry, ensure_ascii=False),
+                ContentType='application/json'
+            )
+        elif summary_cache_table:
+            summary_cache_table.put_item(Item=cache_entry)
+
+        return True
+    except Exception as e:
+        print(f"Error saving summary cache: {str(e)}")
+        return False
+
+class AdaptiveRateController:
+    """Process-wide AIMD pacing for Bedrock requests.
+
+    Callers take a send slot with acquire() before each request. The allowed
+    rate grows additively after every success and is halved when Bedrock
+    throttles, so the processor converges on the account quota instead of
+    relying on fixed sleeps. Throttles reported for requests issued before the
+    latest decrease are ignored, so a burst of concurrent failures halves the
+    rate only once.
+    """
+
+    def __init__(self, initial_rate, min_rate, max_rate, increase):
+        self._lock = threading.Lock()
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self._next_slot = time.monotonic()
+        self._last_decrease = 0.0
+
+    def acquire(self):
+        """Block until the next send slot and return its timestamp"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+
+        if slot > now:
+            time.sleep(slot - now)
+        return slot
+
+    def record_success(self):
+        """Additively increase the allowed rate"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self, slot):
+        """Halve the allowed rate for a throttled request sent at `slot`"""
+        with self._lock:
+            if slot < self._last_decrease:
+                return
+            now = time.monotonic()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._last_decrease = now
+            # Push back slots already handed out at the old rate
+            self._next_slot = max(self._next_slot, now + 1.0 / self.rate)
+
+bedrock_rate_controller = AdaptiveRateController(
+    BEDROCK_INITIAL_RATE, BEDROCK_MIN_RATE, BEDROCK_MAX_RATE, BEDROCK_RATE_INCREASE
+)
+
+def read_streamed_summary(response, on_text=None):
+    """Collect the summary text from an invoke_model_with_response_stream response
+
+    Reading stops as soon as MAX_SUMMARY_CHARS characters have arrived; closing
+    the stream ends generation early, so output that would be truncated for
+    Slack anyway is never produced. `on_text` is called with the text received
+    so far after every chunk.
+    """
+    stream = response['body']
+    parts = []
+    length = 0
+
+    try:
+        for event in stream:
+            chunk = json.loads(event['chunk']['bytes'])
+            if chunk.get('type') == 'message_start':
+                record_prompt_cache_usage(chunk.get('message', {}).get('usage'))
+
+            if MODEL_FAMILY == 'claude':
+                text = chunk.get('delta', {}).get('text', '') if chunk.get('type') == 'content_block_delta' else ''
             else:  # Default for other models
-                request_body = {
-                    "prompt": prompt,
-                    "max_tokens": 1000
+                text = chunk.get('completion', '')
+
+            if not text:
+                continue
+
+            parts.append(text)
+            length += len(text)
+            if on_text:
+                on_text(''.join(parts))
+
+            if length >= MAX_SUMMARY_CHARS:
+                print(f"Summary reached {MAX_SUMMARY_CHARS} characters, stopping the stream early")
+                break
+    finally:
+        stream.close()
+
+    return ''.join(parts)
+
+class BedrockSummaryError(Exception):
+    """Raised when Bedrock could not produce a summary; the message is the error summary text"""
+
+class BedrockDeadlineError(Exception):
+    """Raised when the work deadline passes before Bedrock produced a summary; the article stays pending"""
+
+def build_system_prompt(instructions, cache_prompt=True):
+    """Build the system field for Claude, marking it as a cache point when the instructions are cacheable"""
+    if not (cache_prompt and is_prompt_cacheable(instructions)):
+        return instructions
+    return [
+        {
+            "type": "text",
+            "text": instructions,
+            "cache_control": {"type": "ephemeral"}
+        }
+    ]
+
+def build_request_body(prompt, max_tokens=1000, cache_prompt=True):
+    """Build the invoke_model request body for the configured model family
+
+    `prompt` is an (instructions, message) pair. For Claude the instructions
+    are the same for every article, so they are sent as the system prompt
+    ahead of the article and can be served from Bedrock's prompt cache. Other
+    models get a single prompt with the instructions after the article.
+    Pass cache_prompt=False where prompt caching is not available, such as
+    batch inference input.
+    """
+    instructions, message = prompt
+    if MODEL_FAMILY == 'claude':
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "system": build_system_prompt(instructions, cache_prompt),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": message
                 }
+            ]
+        }
+
+    # Default for other models
+    return {
+        "prompt": f"{message}\n\n{instructions}",
+        "max_tokens": max_tokens
+    }
+
+def record_prompt_cache_usage(usage):
+    """Add the token usage of one Bedrock response to the prompt cache counters"""
+    if not usage:
+        return
+    cache_read_tokens = usage.get('cache_read_input_tokens') or 0
+    with prompt_cache_lock:
+        prompt_cache_stats['requests'] += 1
+        prompt_cache_stats['cache_hits'] += 1 if cache_read_tokens else 0
+        prompt_cache_stats['cache_read_tokens'] += cache_read_tokens
+        prompt_cache_stats['cache_write_tokens'] += usage.get('cache_creation_input_tokens') or 0
+        prompt_cache_stats['input_tokens'] += usage.get('input_tokens') or 0
+
+def reset_prompt_cache_stats():
+    """Reset the prompt cache counters at the start of a run"""
+    with prompt_cache_lock:
+        for key in prompt_cache_stats:
+            prompt_cache_stats[key] = 0
+
+def log_prompt_cache_stats():
+    """Print the prompt cache hit rate of the run, also when caching is off for the model"""
+    with prompt_cache_lock:
+        stats = dict(prompt_cache_stats)
+    hit_rate = stats['cache_hits'] / stats['requests'] if stats['requests'] else 0.0
+    prompt_tokens = stats['cache_read_tokens'] + stats['cache_write_tokens'] + stats['input_tokens']
+    token_hit_rate = stats['cache_read_tokens'] / prompt_tokens if prompt_tokens else 0.0
+    print(f"Prompt cache ({'enabled' if PROMPT_CACHING_ENABLED else 'disabled'} for {BEDROCK_MODEL_ID}): "
+          f"{stats['cache_hits']}/{stats['requests']} requests hit ({hit_rate:.0%}), "
+          f"{stats['cache_read_tokens']} tokens read and {stats['cache_write_tokens']} written "
+          f"({token_hit_rate:.0%} of prompt tokens from cache)")
+
+def extract_response_text(response_body):
+    """Extract the generated text from a model response body"""
+    # Parse response based on model
+    if MODEL_FAMILY == 'claude':
+        return response_body['content'][0]['text']
+    # Default for other models
+    return response_body.get('completion', '')
+
+def check_deadline(deadline, description):
+    """Raise BedrockDeadlineError once the monotonic `deadline` (if any) has passed"""
+    if deadline is not None and time.monotonic() >= deadline:
+        print(f"Work deadline reached, leaving {description} pending")
+        raise BedrockDeadlineError(description)
+
+def invoke_bedrock_with_retry(request_body, description, stream=False, on_text=None, deadline=None):
+    """Invoke the Bedrock model and return the generated text
+
+    Every attempt takes a slot from the shared rate controller; throttled
+    attempts are retried up to MAX_RETRIES times. Raises BedrockSummaryError
+    when the call fails for good, and BedrockDeadlineError when `deadline`
+    (a time.monotonic() value) passes before an attempt is sent.
+    """
+    body = json.dumps(request_body)
+    retry_count = 0
+    slot = 0.0
+
+    while True:
+        check_deadline(deadline, description)
+        try:
+            # Invoke Bedrock model once the shared rate controller allows it
+            slot = bedrock_rate_controller.acquire()
+            check_deadline(deadline, description)
+            if stream:
+                response = bedrock_runtime.invoke_model_with_response_stream(
+                    modelId=BEDROCK_MODEL_ID,
+                    body=body
+                )
+                text = read_streamed_summary(response, on_text)
+                bedrock_rate_controller.record_success()
+                return text
 
-            # Invoke Bedrock model
             response = bedrock_runtime.invoke_model(
                 modelId=BEDROCK_MODEL_ID,
-                body=json.dumps(request_body)
+                body=body
             )
+            bedrock_rate_controller.record_success()
 
-            # Parse response based on model
             response_body = json.loads(response['body'].read())
-
-            if "claude" in BEDROCK_MODEL_ID.lower():
-                summary = response_body['content'][0]['text']
-            else:  # Default for other models
-                summary = response_body.get('completion', '')
-
-            return summary
+            record_prompt_cache_usage(response_body.get('usage'))
+            return extract_response_text(response_body)
 
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', '')
+            # Errors raised mid-stream (EventStreamError) use lower camel case, e.g. throttlingException
+            error_code = error_code[:1].upper() + error_code[1:]
 
             # Retry for ThrottlingException or ServiceQuotaExceeded
-            if error_code in ["ThrottlingException", "ServiceQuotaExceeded", "TooManyRequestsException"]:
+            if error_code in THROTTLING_ERROR_CODES:
                 retry_count += 1
+                bedrock_rate_controller.record_throttle(slot)
 
                 if retry_count > MAX_RETRIES:
-                    print(f"Maximum retries reached ({MAX_RETRIES}). Giving up on article: {article_data.get('title')}")
-                    return f"Error generating summary after {MAX_RETRIES} retries: {str(e)}"
-
-                # Apply exponential backoff with jitter (randomization)
-                jitter = random.uniform(1, 5)  # Random value between 1 and 5 seconds
-                delay = (2 ** retry_count) * base_delay + jitter
+                    print(f"Maximum retries reached ({MAX_RETRIES}). Giving up on {description}")
+                    raise BedrockSummaryError(f"Error generating summary after {MAX_RETRIES} retries: {str(e)}")
 
-                print(f"Bedrock API throttled. Retry {retry_count}/{MAX_RETRIES} after {delay:.2f} seconds")
-                time.sleep(delay)
+                # The retry waits for its next slot from the rate controller
+                print(f"Bedrock API throttled. Retry {retry_count}/{MAX_RETRIES} at {bedrock_rate_controller.rate:.2f} requests/second")
             else:
                 # Fail immediately for other errors
                 print(f"Error summarizing with Bedrock: {str(e)}")
-                return f"Error generating summary: {str(e)}"
+                raise BedrockSummaryError(f"Error generating summary: {str(e)}")
 
-        except Exception as e:
-            print(f"Unexpected error summarizing with Bedrock: {str(e)}")
-            return f"Error generating summary: {str(e)}"
+def estimate_tokens(text):
+    """Cheaply estimate the token count of a text
+
+    Roughly four ASCII characters make a token, while CJK and other non-ASCII
+    characters tend to take about one token each.
+    """
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+def is_prompt_cacheable(instructions):
+    """Check whether an instruction block should be marked as a prompt cache point
+
+    PROMPT_CACHING=true always marks it. With 'auto' the model has to support
+    prompt caching and the block has to reach the model's minimum cacheable
+    length, because Bedrock never caches shorter prefixes.
+    """
+    if MODEL_FAMILY != 'claude' or PROMPT_CACHING == 'false':
+        return False
+    if PROMPT_CACHING == 'true':
+        return True
+    minimum_tokens = next(
+        (tokens for model, tokens in PROMPT_CACHING_MODELS.items() if model in BEDROCK_MODEL_ID.lower()), None
+    )
+    return minimum_tokens is not None and estimate_tokens(instructions) >= minimum_tokens
+
+# Whether the article instructions, sent with every on-demand request, are cached
+PROMPT_CACHING_ENABLED = is_prompt_cacheable(get_prompt_template('article_instructions', OUTPUT_LANGUAGE).substitute())
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut a text down to an estimated token budget"""
+    if max_tokens <= 0:
+        return ''
+    cut = text[:max_tokens * 4]
+    while cut and estimate_tokens(cut) > max_tokens:
+        cut = cut[:int(len(cut) * 0.9)]
+    return cut
+
+def record_content_trim(tokens_trimmed):
+    """Update the per-run counters of content trimmed to fit the input budget"""
+    with content_budget_lock:
+        content_budget_stats['articles_trimmed'] += 1
+        content_budget_stats['tokens_trimmed'] += tokens_trimmed
+
+def reset_content_budget_stats():
+    """Reset the content trimming counters at the start of a run"""
+    with content_budget_lock:
+        content_budget_stats['articles_trimmed'] = 0
+        content_budget_stats['tokens_trimmed'] = 0
+
+def fit_content_to_budget(content, max_tokens):
+    """Trim article content to an estimated token budget
+
+    The opening paragraphs are kept first, then paragraphs mentioning pricing
+    or regions, then the rest in order while they fit; the kept paragraphs stay
+    in their original order. Returns the content and the estimated number of
+    tokens removed.
+    """
+    total_tokens = estimate_tokens(content)
+    if total_tokens <= max_tokens:
+        return content, 0
+
+    paragraphs = [paragraph.strip() for paragraph in PARAGRAPH_SPLIT_PATTERN.split(content) if paragraph.strip()]
+    priority = list(range(min(2, len(paragraphs))))
+    priority += [index for index, paragraph in enumerate(paragraphs) if PRIORITY_SECTION_PATTERN.search(paragraph)]
+    priority += list(range(len(paragraphs)))
+
+    selected = set()
+    used_tokens = 0
+    for index in priority:
+        if index in selected:
+            continue
+        paragraph_tokens = estimate_tokens(paragraphs[index])
+        if used_tokens + paragraph_tokens <= max_tokens:
+            selected.add(index)
+            used_tokens += paragraph_tokens
+
+    if selected:
+        trimmed = '\n\n'.join(paragraphs[index] for index in sorted(selected))
+    else:
+        # Even the first paragraph is too long, so cut it
+        trimmed = truncate_to_tokens(paragraphs[0] if paragraphs else content, max_tokens)
+
+    return trimmed, total_tokens - estimate_tokens(trimmed)
+
+def build_article_prompt(article_data, language='en'):
+    """Build the (instructions, message) prompt pair for a single article
+
+    The content is trimmed so the whole prompt stays within MAX_INPUT_TOKENS.
+    """
+    # Prepare content for summarization; the placeholder is swapped for the
+    # trimmed content once the size of the rest of the prompt is known
+    content = CONTENT_PLACEHOLDER
+    title = article_data.get('title', '')
+    source = article_data.get('source', '')
+    link = article_data.get('link', '')
+
+    prompt = get_prompt_template('article', language).substitute(
+        title=title,
+        source=source,
+        link=link,
+        content=content
+    )
+
+    instructions = get_prompt_template('article_instructions', language).substitute()
+
+    overhead_tokens = estimate_tokens(instructions) + estimate_tokens(prompt.replace(CONTENT_PLACEHOLDER, ''))
+    content, tokens_trimmed = fit_content_to_budget(article_data.get('content', ''), MAX_INPUT_TOKENS - overhead_tokens)
+    if tokens_trimmed:
+        record_content_trim(tokens_trimmed)
+
+    return instructions, prompt.replace(CONTENT_PLACEHOLDER, content)
+
+def summarize_article_with_bedrock(article_data, language='en', on_text=None, deadline=None):
+    """Summarize article using Bedrock with optional translation and robust retry mechanism
+
+    With BEDROCK_STREAMING enabled the response is streamed, and `on_text` (if
+    given) receives the summary text accumulated so far; after a retry it
+    starts again from the beginning. BedrockDeadlineError is raised rather than
+    returned as a summary, so the article is not stored.
+    """
+    try:
+        # Skip if no content
+        if not article_data.get('content', ''):
+            return "No content available for summarization."
+
+        prompt = build_article_prompt(article_data, language)
+        request_body = build_request_body(prompt)
+        return invoke_bedrock_with_retry(
+            request_body,
+            f"article: {article_data.get('title', '')}",
+            stream=BEDROCK_STREAMING,
+            on_text=on_text,
+            deadline=deadline
+        )
+
+    except BedrockSummaryError as e:
+        return str(e)
+
+    except BedrockDeadlineError:
+        raise
+
+    except Exception as e:
+        print(f"Unexpected error summarizing with Bedrock: {str(e)}")
+        return f"Error generating summary: {str(e)}"
+
+def build_batch_prompt(articles, language='en'):
+    """Build one prompt asking for separate analyses of several announcements
+
+    The instruction block is sent once for the whole group, and the answer is
+    requested as JSON keyed by each announcement's position in the prompt.
+    Returns an (instructions, message) pair like build_article_prompt.
+    """
+    item_template = get_prompt_template('batch_item', language)
+    article_blocks = [
+        item_template.substitute(
+            position=position,
+            title=article.get('title', ''),
+            source=article.get('source', ''),
+            link=article.get('link', ''),
+            content=article.get('content', '')
+        )
+        for position, article in enumerate(articles, 1)
+    ]
+
+    message = get_prompt_template('batch', language).substitute(
+        count=len(articles),
+        announcements='\n'.join(article_blocks)
+    )
+    return get_prompt_template('batch_instructions', language).substitute(), message
+
+def parse_batch_summaries(text):
+    """Split a batch response into a dict of announcement position to summary
+
+    Anything before the first '{' or after the last '}' is ignored, and
+    malformed entries are skipped so their articles fall back to single calls.
+    """
+    summaries = {}
+    for entry in iter_batch_entries(text):
+        try:
+            position = int(entry['id'])
+            summary = entry['summary'].strip()
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        if summary:
+            summaries[position] = summary
+    return summaries
+
+def iter_batch_entries(text):
+    """Yield the entries of a batch response's summaries list
+
+    A response cut off at max_tokens is not valid JSON as a whole, so the
+    entries are then decoded one at a time and every complete one is kept.
+    """
+    try:
+        payload = json.loads(text[text.index('{'):text.rindex('}') + 1])
+        yield from payload.get('summaries', []) if isinstance(payload, dict) else []
+        return
+    except ValueError:
+        pass
+
+    list_start = text.find('[', max(text.find('"summaries"'), 0))
+    if list_start < 0:
+        return
+
+    decoder = json.JSONDecoder()
+    position = list_start + 1
+    while True:
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+        try:
+            entry, position = decoder.raw_decode(text, position)
+        except ValueError:
+            return
+        yield entry
+
+def is_batchable_article(article_data):
+    """Only short announcements with content are packed into batch prompts"""
+    content = article_data.get('content', '')
+    return bool(content) and len(content) <= BATCH_PROMPT_MAX_CONTENT_CHARS
+
+def summarize_article_group(articles, language='en', deadline=None):
+    """Summarize a group of articles, returning one summary per article
+
+    Groups of more than one article share a single batch prompt; any article
+    missing from the batch response is summarized on its own.
+    """
+    if len(articles) == 1:
+        return [summarize_article_with_bedrock(articles[0], language, deadline=deadline)]
+
+    summaries_by_position = {}
+    try:
+        request_body = build_request_body(
+            build_batch_prompt(articles, language),
+            max_tokens=min(BATCH_PROMPT_TOKENS_PER_ARTICLE * len(articles), BATCH_PROMPT_MAX_TOKENS)
+        )
+        # A streamed response cut at MAX_SUMMARY_CHARS would not be valid JSON
+        text = invoke_bedrock_with_retry(request_body, f"batch of {len(articles)} articles", deadline=deadline)
+        summaries_by_position = parse_batch_summaries(text)
+    except BedrockSummaryError:
+        pass
+    except BedrockDeadlineError:
+        raise
+    except Exception as e:
+        print(f"Unexpected error summarizing batch with Bedrock: {str(e)}")
+
+    print(f"Batch prompt returned {len(summaries_by_position)}/{len(articles)} summaries")
+
+    summaries = []
+    for position, article in enumerate(articles, 1):
+        summary = summaries_by_position.get(position)
+        if not summary:
+            print(f"Falling back to a single call for article: {article.get('title', 'No Title')}")
+            summary = summarize_article_with_bedrock(article, language, deadline=deadline)
+        summaries.append(summary)
+    return summaries
 
 def update_article_in_dynamodb(article_id, summary):
     """Update article in DynamoDB with summary"""
     try:
         news_table.update_item(
             Key={'id': article_id},
-            UpdateExpression='SET summary = :summary, #proc = :processed_val, processed_at = :processed_at',
+            UpdateExpression='SET summary = :summary, #proc = :processed_val, processed_at = :processed_at REMOVE #shard',
             ExpressionAttributeNames={
-                '#proc': 'processed'
+                '#proc': 'processed',
+                '#shard': 'pending_shard'
             },
             ExpressionAttributeValues={
                 ':summary': summary,
@@ -213,7 +845,7 @@ def update_article_in_s3(article_data, summary):
     try:
         article_id = article_data['id']
         source = article_data['source']
-        s3_key = f"articles/{source}/{article_id}.json"
+        s3_key = f"{ARTICLES_PREFIX}{source}/{article_id}.json"
 
         # Update article data
         article_data['summary'] = summary
@@ -228,13 +860,119 @@ def update_article_in_s3(article_data, summary):
             ContentType='application/json'
         )
 
+        # Drop the article from the pending backlog
+        delete_pending_marker_in_s3(article_data)
+
         return True
     except Exception as e:
         print(f"Error updating article in S3: {str(e)}")
         return False
 
+def build_slack_article_blocks(article, read_more_text):
+    """Build the Slack blocks for one article summary"""
+    title = article.get('title', 'No Title')
+    source = article.get('source', 'Unknown Source')
+    summary = article.get('summary', 'No summary available')
+    link = article.get('link', '#')
+
+    # Add a divider between articles
+    blocks = [{"type": "divider"}]
+
+    # Add title and source
+    blocks.append({
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": f"*{title}*\n_Source: {source}_"
+        }
+    })
+
+    # Add summary (truncate if too long for Slack)
+    # Slack blocks have a text limit of 3000 characters
+    if len(summary) > 2900:
+        summary = summary[:2900] + "..."
+
+    blocks.append({
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": summary
+        }
+    })
+
+    # Add link if available
+    if link and link != '#':
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"<{link}|{read_more_text}>"
+            }
+        })
+
+    return blocks
+
+def build_slack_header_block(header_text):
+    return {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": header_text
+        }
+    }
+
+def pack_slack_messages(header_text, intro_text, articles, read_more_text):
+    """Split the digest into Slack messages within the block and size limits
+
+    Every message starts with the header (numbered when the digest needs more
+    than one message), the first one also carries the intro, and the blocks
+    of an article are never split across messages. Returns a list of
+    (message, articles in the message) pairs.
+    """
+    intro_block = {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": intro_text
+        }
+    }
+    block_groups = [[intro_block]] + [build_slack_article_blocks(article, read_more_text) for article in articles]
+
+    # Reserve room for the numbered header every message gets
+    packed = slack_client.pack_block_groups(
+        block_groups,
+        reserved_blocks=[build_slack_header_block(f"{header_text} (000/000)")]
+    )
+
+    total = len(packed)
+    return [
+        (
+            {"blocks": [build_slack_header_block(f"{header_text} ({number}/{total})" if total > 1 else header_text)] +
+                       [block for index in group_indexes for block in block_groups[index]]},
+            [articles[index - 1] for index in group_indexes if index > 0]
+        )
+        for number, group_indexes in enumerate(packed, 1)
+    ]
+
+def post_slack_messages(messages):
+    """Post messages to the Slack webhook in order
+
+    The shared Slack client sends them over one kept-alive connection and
+    retries each message on its own. Returns the indexes of the messages that
+    could not be delivered.
+    """
+    failed = []
+    for index, message in enumerate(messages):
+        if not slack_client.post_message(SLACK_WEBHOOK_URL, message, f"Slack message {index + 1}/{len(messages)}"):
+            failed.append(index)
+    return failed
+
 def send_slack_notification(articles_with_summaries):
-    """Send Slack notification with article summaries"""
+    """Send Slack notification with article summaries
+
+    The digest is split into as many messages as Slack's limits require. If
+    some of them cannot be delivered, their articles are sent through SNS.
+    """
     try:
         if not SLACK_WEBHOOK_URL:
             print("No Slack webhook URL configured")
@@ -250,100 +988,103 @@ def send_slack_notification(articles_with_summaries):
             intro_text = "Here are your daily AWS announcement summaries:"
             read_more_text = "Read Full Announcement"
 
-        # Create Slack message with blocks
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": header_text
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": intro_text
-                }
-            }
-        ]
-
-        # Add each article summary as blocks
-        for article in articles_with_summaries:
-            title = article.get('title', 'No Title')
-            source = article.get('source', 'Unknown Source')
-            summary = article.get('summary', 'No summary available')
-            link = article.get('link', '#')
-
-            # Add a divider between articles
-            blocks.append({"type": "divider"})
-
-            # Add title and source
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*{title}*\n_Source: {source}_"
-                }
-            })
-
-            # Add summary (truncate if too long for Slack)
-            # Slack blocks have a text limit of 3000 characters
-            if len(summary) > 2900:
-                summary = summary[:2900] + "..."
-
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": summary
-                }
-            })
-
-            # Add link if available
-            if link and link != '#':
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"<{link}|{read_more_text}>"
-                    }
-                })
-
-        # Prepare the Slack message payload
-        slack_message = {
-            "blocks": blocks
-        }
-
-        # Send to Slack
-        try:
-            data = json.dumps(slack_message).encode('utf-8')
-            req = urllib.request.Request(
-                SLACK_WEBHOOK_URL,
-                data=data,
-                headers={'Content-Type': 'application/json'}
-            )
-
-            with urllib.request.urlopen(req) as response:
-                print(f"Slack notification sent successfully: {response.read().decode('utf-8')}")
-                return True
+        packed_messages = pack_slack_messages(header_text, intro_text, articles_with_summaries, read_more_text)
+        print(f"Sending the digest as {len(packed_messages)} Slack messages")
 
-        except Exception as e:
-            print(f"Error sending Slack notification: {str(e)}")
+        failed = post_slack_messages([message for message, _ in packed_messages])
+        if not failed:
+            return True
 
-            # If Slack fails, try SNS as fallback
-            if SNS_TOPIC_ARN:
-                print("Falling back to SNS notification")
-                return send_sns_notification(articles_with_summaries)
+        # If Slack fails, send the undelivered articles through SNS as a fallback
+        undelivered_articles = [article for index in failed for article in packed_messages[index][1]]
+        if SNS_TOPIC_ARN:
+            print(f"Falling back to SNS notification for {len(undelivered_articles)} articles")
+            return send_sns_notification(undelivered_articles)
 
-            return False
+        return False
 
     except Exception as e:
         print(f"Error preparing Slack notification: {str(e)}")
         return False
 
+def build_sns_text_digest(heading, articles_with_summaries):
+    """Build the plain-text digest for email and other text subscribers"""
+    parts = [heading, "\n\n"]
+
+    # Add each article summary
+    for article in articles_with_summaries:
+        link = article.get('link', '#')
+        parts.extend([
+            f"{article.get('title', 'No Title')}\n",
+            f"Source: {article.get('source', 'Unknown Source')}\n",
+            f"{article.get('summary', 'No summary available')}\n"
+        ])
+
+        # Add link explicitly in the message body if available
+        if link and link != '#':
+            parts.append(f"More information: {link}\n\n")
+        else:
+            parts.append("\n")
+
+    return ''.join(parts)
+
+def build_sns_pointer_text(heading, articles_with_summaries, location, max_bytes):
+    """Build a short text digest listing the articles and where the full digest is stored"""
+    footer = f"\nThe full digest with summaries is stored at {location}\n"
+    parts = [heading, "\n\n"]
+    size = len(heading.encode('utf-8')) + len(footer.encode('utf-8')) + 2
+
+    for position, article in enumerate(articles_with_summaries):
+        line = f"- {article.get('title', 'No Title')}: {article.get('link', '#')}\n"
+        line_bytes = len(line.encode('utf-8'))
+        if size + line_bytes > max_bytes:
+            parts.append(f"... and {len(articles_with_summaries) - position} more\n")
+            break
+        parts.append(line)
+        size += line_bytes
+
+    parts.append(footer)
+    return ''.join(parts)
+
+def store_claim_check(digest):
+    """Store a full notification digest and return a pointer to it
+
+    With CLAIM_CHECK_STORAGE=local the digest is written under
+    CLAIM_CHECK_LOCAL_DIR instead of the news bucket.
+    """
+    key = f"{NOTIFICATIONS_PREFIX}{datetime.datetime.now().strftime('%Y-%m-%d')}/{uuid.uuid4()}.json"
+    body = json.dumps(digest, ensure_ascii=False)
+
+    if CLAIM_CHECK_STORAGE == 'local':
+        path = os.path.join(CLAIM_CHECK_LOCAL_DIR, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(body)
+        return {'storage': 'local', 'path': path}
+
+    s3_client.put_object(
+        Bucket=NEWS_BUCKET_NAME,
+        Key=key,
+        Body=body,
+        ContentType='application/json'
+    )
+    return {'storage': 's3', 'bucket': NEWS_BUCKET_NAME, 'key': key}
+
+def build_sns_message(text, lambda_payload):
+    """Build the per-protocol SNS message for MessageStructure=json"""
+    return json.dumps({
+        "default": text,
+        "email": text,
+        "lambda": json.dumps(lambda_payload, ensure_ascii=False)
+    }, ensure_ascii=False)
+
 def send_sns_notification(articles_with_summaries):
-    """Send SNS notification with article summaries"""
+    """Send SNS notification with article summaries
+
+    When the message would exceed SNS_MESSAGE_BYTES_LIMIT (or SNS_CLAIM_CHECK
+    is 'always'), the full digest is stored as a claim check and SNS carries
+    a short text listing plus a pointer that sns_to_slack resolves.
+    """
     try:
         if not SNS_TOPIC_ARN:
             print("No SNS topic ARN configured")
@@ -352,50 +1093,51 @@ def send_sns_notification(articles_with_summaries):
         # Prepare notification content with language-specific subjects
         if OUTPUT_LANGUAGE == 'ja':
             subject = f"AWS News Summary - {datetime.datetime.now().strftime('%Y-%m-%d')}"
-            message = f"AWS News Summary for {datetime.datetime.now().strftime('%Y-%m-%d')}\n\n"
+            heading = f"AWS News Summary for {datetime.datetime.now().strftime('%Y-%m-%d')}"
         else:
             subject = f"AWS News Summary - {datetime.datetime.now().strftime('%Y-%m-%d')}"
-            message = f"AWS News Summaries for {datetime.datetime.now().strftime('%Y-%m-%d')}\n\n"
-
-        # Add each article summary
-        for article in articles_with_summaries:
-            title = article.get('title', 'No Title')
-            source = article.get('source', 'Unknown Source')
-            summary = article.get('summary', 'No summary available')
-            link = article.get('link', '#')
-
-            message += f"{title}\n"
-            message += f"Source: {source}\n"
-            message += f"{summary}\n"
-
-            # Add link explicitly in the message body if available
-            if link and link != '#':
-                if OUTPUT_LANGUAGE == 'ja':
-                    message += f"More information: {link}\n\n"
-                else:
-                    message += f"More information: {link}\n\n"
-            else:
-                message += "\n"
+            heading = f"AWS News Summaries for {datetime.datetime.now().strftime('%Y-%m-%d')}"
 
         # Format the articles as JSON for better compatibility with Lambda functions
         # that may subscribe to this topic (like a Slack notification Lambda)
-        articles_json = []
-        for article in articles_with_summaries:
-            articles_json.append({
+        articles_json = [
+            {
                 "title": article.get('title', 'No Title'),
                 "source": article.get('source', 'Unknown Source'),
                 "summary": article.get('summary', 'No summary available'),
                 "link": article.get('link', '#')
+            }
+            for article in articles_with_summaries
+        ]
+
+        message = None
+        if SNS_CLAIM_CHECK != 'always':
+            message = build_sns_message(build_sns_text_digest(heading, articles_with_summaries), articles_json)
+            message_bytes = len(message.encode('utf-8'))
+            if message_bytes > SNS_MESSAGE_BYTES_LIMIT:
+                if SNS_CLAIM_CHECK == 'never':
+                    print(f"SNS message is {message_bytes} bytes, over the {SNS_MESSAGE_BYTES_LIMIT} byte limit")
+                    return False
+                print(f"SNS message is {message_bytes} bytes, storing the digest as a claim check")
+                message = None
+
+        if message is None:
+            pointer = store_claim_check({
+                "subject": subject,
+                "text": build_sns_text_digest(heading, articles_with_summaries),
+                "articles": articles_json
             })
+            location = pointer['path'] if pointer['storage'] == 'local' else f"s3://{pointer['bucket']}/{pointer['key']}"
+            print(f"Stored the notification digest at {location}")
+            message = build_sns_message(
+                build_sns_pointer_text(heading, articles_with_summaries, location, SNS_MESSAGE_BYTES_LIMIT // 4),
+                {"claim_check": pointer, "count": len(articles_json)}
+            )
 
         # Send notification with both text and structured format
         response = sns_client.publish(
             TopicArn=SNS_TOPIC_ARN,
-            Message=json.dumps({
-                "default": message,
-                "email": message,
-                "lambda": json.dumps(articles_json)
-            }),
+            Message=message,
             Subject=subject,
             MessageStructure="json"  # This enables sending different message formats to different endpoints
         )
@@ -406,81 +1148,624 @@ def send_sns_notification(articles_with_summaries):
         print(f"Error sending SNS notification: {str(e)}")
         return False
 
-def process_articles():
-    """Process unprocessed articles with improved batch processing"""
-    articles_with_summaries = []
+def store_summary(article, summary):
+    """Persist a summary for an article according to the storage type"""
+    if STORAGE_TYPE == 's3':
+        return update_article_in_s3(article, summary)
+    # default to dynamodb
+    return update_article_in_dynamodb(article.get('id'), summary)
+
+def has_time_for_more_work(context):
+    """Check whether enough of the Lambda time budget is left to start another article"""
+    if context is None:
+        return True
+    return context.get_remaining_time_in_millis() > TIME_BUDGET_RESERVE_MS
+
+def get_work_deadline(context):
+    """Monotonic time by which in-flight Bedrock work has to finish, or None without a Lambda context
+
+    Leaves WORK_DEADLINE_RESERVE_MS of the invocation for storing, notifying
+    and scheduling the continuation.
+    """
+    if context is None:
+        return None
+    return time.monotonic() + (context.get_remaining_time_in_millis() - WORK_DEADLINE_RESERVE_MS) / 1000.0
+
+def schedule_continuation(context, continuation):
+    """Re-invoke this function asynchronously to carry on with the backlog
+
+    Processed articles leave the pending index/prefix, so the next invocation
+    picks up exactly what is left; the token only carries the run id and a
+    sequence number that bounds the chain.
+    """
+    if context is None:
+        print("No Lambda context, not scheduling a continuation")
+        return None
+
+    if continuation['sequence'] > MAX_CONTINUATIONS:
+        print(f"Maximum continuations reached ({MAX_CONTINUATIONS}), leaving the rest for the next scheduled run")
+        return None
 
+    try:
+        lambda_client.invoke(
+            FunctionName=context.function_name,
+            InvocationType='Event',  # Asynchronous invocation
+            Payload=json.dumps({'continuation': continuation})
+        )
+        print(f"Scheduled continuation {continuation['sequence']} for run {continuation['run_id']}")
+        return continuation
+    except Exception as e:
+        print(f"Error scheduling continuation: {str(e)}")
+        return None
+
+def summarize_articles(articles, context=None, notifier=None):
+    """Summarize and store articles with a bounded pool of concurrent Bedrock calls
+
+    New articles are only started while the Lambda has more than
+    TIME_BUDGET_RESERVE_MS left, and work still in flight when only
+    WORK_DEADLINE_RESERVE_MS is left is abandoned: throttle retries stop and
+    the articles stay pending for the continuation. Each stored article is
+    passed to `notifier` (a NotificationStream) when one is given. Returns a
+    dict of article index to the article with its summary for every article
+    that was stored, and the number of articles that were handled (started and
+    not abandoned).
+    """
+    total_articles = len(articles)
+    reset_content_budget_stats()
+    reset_prompt_cache_stats()
+    print(f"Output language set to: {OUTPUT_LANGUAGE}")
+    print(f"Summarizing with up to {MAX_CONCURRENCY} concurrent Bedrock calls")
+
+    # Only the Bedrock calls run on worker threads; storage updates stay on this
+    # thread because boto3 resources (the DynamoDB table) are not thread-safe
+    completed = {}
+
+    def record_summary(index, summary):
+        article = articles[index]
+        title = article.get('title', 'No Title')
+
+        # Update article with summary as soon as it is ready
+        if store_summary(article, summary):
+            article_with_summary = article.copy()
+            article_with_summary['summary'] = summary
+            completed[index] = article_with_summary
+            print(f"Successfully processed article: {title} ({len(completed)}/{total_articles})")
+            if notifier:
+                notifier.add(article_with_summary)
+
+    cache_hits = 0
+    next_index = 0
+    abandoned = 0
+    deadline = get_work_deadline(context)
+    # Not used as a context manager: shutting down must not wait for abandoned calls
+    executor = ThreadPoolExecutor(max_workers=max(1, MAX_CONCURRENCY))
+    try:
+        in_flight = {}
+
+        while next_index < total_articles or in_flight:
+            # Pull new work while there are free workers and time left
+            while next_index < total_articles and len(in_flight) < MAX_CONCURRENCY and has_time_for_more_work(context):
+                # Short announcements are grouped into one batch prompt when enabled
+                group = []
+                while next_index < total_articles and len(group) < BATCH_GROUP_SIZE:
+                    index = next_index
+                    article = articles[index]
+                    batchable = is_batchable_article(article)
+                    if group and not batchable:
+                        break
+                    next_index += 1
+
+                    cache_key = get_summary_cache_key(article, OUTPUT_LANGUAGE)
+                    cached_summary = get_cached_summary(cache_key)
+                    if cached_summary:
+                        # Already summarized this content with the same model and prompt
+                        cache_hits += 1
+                        record_summary(index, cached_summary)
+                        continue
+
+                    print(f"Queued article: {article.get('title', 'No Title')}")
+                    group.append((index, cache_key))
+                    if not batchable:
+                        break
+
+                if group:
+                    future = executor.submit(summarize_article_group, [articles[index] for index, _ in group], OUTPUT_LANGUAGE, deadline)
+                    in_flight[future] = group
+
+            if not in_flight:
+                if next_index < total_articles:
+                    print(f"Time budget nearly used, stopping with {total_articles - next_index} articles left")
+                    break
+                continue
+
+            # With a notifier, wake up in time to send summaries that are due,
+            # and never wait past the work deadline
+            timeout = notifier.flush_seconds if notifier else None
+            if deadline is not None:
+                time_left = max(0.0, deadline - time.monotonic())
+                timeout = time_left if timeout is None else min(timeout, time_left)
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            if notifier:
+                notifier.flush_if_due()
+
+            for future in done:
+                group = in_flight.pop(future)
+
+                try:
+                    summaries = future.result()
+                except BedrockDeadlineError:
+                    abandoned += len(group)
+                    continue
+                except Exception as e:
+                    print(f"Unexpected error summarizing {len(group)} articles: {str(e)}")
+                    continue
+
+                for (index, cache_key), summary in zip(group, summaries):
+                    if is_cacheable_summary(summary):
+                        save_summary_to_cache(cache_key, summary)
+                    record_summary(index, summary)
+
+            # Calls still running (e.g. a slow Bedrock response) are left behind
+            if deadline is not None and time.monotonic() >= deadline and in_flight:
+                still_running = sum(len(group) for group in in_flight.values())
+                print(f"Work deadline reached, leaving {still_running} in-flight articles pending")
+                abandoned += still_running
+                in_flight.clear()
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if abandoned:
+        print(f"{abandoned} articles were abandoned at the work deadline")
+    print(f"Summary cache hits: {cache_hits}/{total_articles}")
+    print(f"Content trimmed to the input budget for {content_budget_stats['articles_trimmed']} articles "
+          f"(~{content_budget_stats['tokens_trimmed']} tokens)")
+    log_prompt_cache_stats()
+
+    print(f"Bedrock request rate settled at {bedrock_rate_controller.rate:.2f} requests/second")
+
+    return completed, next_index - abandoned
+
+def send_notifications(articles_with_summaries):
+    """Send the digest for processed articles to Slack, or SNS if Slack is not configured"""
+    if not articles_with_summaries:
+        return
+
+    print(f"Sending notifications for {len(articles_with_summaries)} processed articles")
+    # Try Slack notification first
+    if SLACK_WEBHOOK_URL:
+        send_slack_notification(articles_with_summaries)
+        # If Slack fails and SNS is configured, the slack function will fall back to SNS
+    # If no Slack webhook is configured but SNS is, use SNS directly
+    elif SNS_TOPIC_ARN:
+        send_sns_notification(articles_with_summaries)
+
+class NotificationStream:
+    """Send finished summaries in small batches while summarization continues
+
+    Summaries are collected with add() and handed to a background sender once
+    `flush_count` are ready or the oldest has waited `flush_seconds`, so Slack
+    delivery overlaps with the Bedrock calls still in flight and a failure
+    later in the run does not lose what was already summarized. close() sends
+    the rest and waits until everything is delivered.
+    """
+
+    def __init__(self, flush_count, flush_seconds):
+        self.flush_count = max(1, flush_count)
+        self.flush_seconds = flush_seconds
+        self._pending = []
+        self._oldest = None
+        # A single sender thread keeps the batches in order
+        self._sender = ThreadPoolExecutor(max_workers=1)
+        self.batches_sent = 0
+
+    def add(self, article_with_summary):
+        if not self._pending:
+            self._oldest = time.monotonic()
+        self._pending.append(article_with_summary)
+
+        if len(self._pending) >= self.flush_count:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        if self._pending and time.monotonic() - self._oldest >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        batch, self._pending = self._pending, []
+        if batch:
+            self._sender.submit(send_notifications, batch)
+            self.batches_sent += 1
+
+    def close(self):
+        self.flush()
+        self._sender.shutdown(wait=True)
+        print(f"Sent notifications in {self.batches_sent} batches")
+
+def create_notifier():
+    """Create a NotificationStream in streaming notification mode, otherwise None"""
+    if NOTIFICATION_MODE == 'streaming':
+        return NotificationStream(NOTIFICATION_FLUSH_COUNT, NOTIFICATION_FLUSH_SECONDS)
+    return None
+
+def process_articles(context=None, continuation=None):
+    """Process unprocessed articles from storage within the Lambda time budget
+
+    Whatever finished is stored and notified, and the function re-invokes
+    itself with a continuation token for the rest of the backlog.
+    """
     # Get unprocessed articles based on storage type
     if STORAGE_TYPE == 's3':
         unprocessed_articles = get_unprocessed_articles_from_s3()
     else:  # default to dynamodb
         unprocessed_articles = get_unprocessed_articles_from_dynamodb()
+    unprocessed_articles = select_stale_articles(unprocessed_articles)
 
     total_articles = len(unprocessed_articles)
-    print(f"Found {total_articles} unprocessed AWS announcements")
-    print(f"Output language set to: {OUTPUT_LANGUAGE}")
-    print(f"Processing in batches of {BATCH_SIZE}")
-
-    # Split articles for batch processing
-    for i in range(0, total_articles, BATCH_SIZE):
-        batch = unprocessed_articles[i:i+BATCH_SIZE]
-        print(f"Processing batch {i//BATCH_SIZE + 1}/{(total_articles + BATCH_SIZE - 1)//BATCH_SIZE} ({len(batch)} articles)")
-
-        # Process each article in the current batch
-        for article in batch:
-            article_id = article.get('id')
-            title = article.get('title', 'No Title')
-            print(f"Processing article: {title}")
-
-            # Summarize article in the specified language
-            summary = summarize_article_with_bedrock(article, OUTPUT_LANGUAGE)
-
-            # Update article with summary
-            if STORAGE_TYPE == 's3':
-                update_success = update_article_in_s3(article, summary)
-            else:  # default to dynamodb
-                update_success = update_article_in_dynamodb(article_id, summary)
-
-            if update_success:
-                # Add article with summary to list for notification
-                article_with_summary = article.copy()
-                article_with_summary['summary'] = summary
-                articles_with_summaries.append(article_with_summary)
-                print(f"Successfully processed article: {title}")
-
-            # Short wait between articles in a batch
-            if len(batch) > 1:
-                time.sleep(0.5)
-
-        # Wait between batches (to avoid API rate limits)
-        if i + BATCH_SIZE < total_articles:
-            batch_delay = random.uniform(5, 15)  # Random wait between 5-15 seconds
-            print(f"Waiting {batch_delay:.2f} seconds before next batch...")
-            time.sleep(batch_delay)
-
-    # Send notification if articles were processed
-    if articles_with_summaries:
-        print(f"Sending notifications for {len(articles_with_summaries)} processed articles")
-        # Try Slack notification first
-        if SLACK_WEBHOOK_URL:
-            slack_success = send_slack_notification(articles_with_summaries)
-            # If Slack fails and SNS is configured, the slack function will fall back to SNS
-        # If no Slack webhook is configured but SNS is, use SNS directly
-        elif SNS_TOPIC_ARN:
-            send_sns_notification(articles_with_summaries)
+    print(f"Found {total_articles} unprocessed articles")
+
+    notifier = create_notifier()
+    try:
+        completed, handled = summarize_articles(unprocessed_articles, context, notifier)
+    finally:
+        if notifier:
+            notifier.close()
+
+    # Keep the notification in the original article order
+    articles_with_summaries = [completed[index] for index in sorted(completed)]
+    if not notifier:
+        send_notifications(articles_with_summaries)
+
+    # Hand the rest of the backlog to a fresh invocation
+    if handled < total_articles:
+        continuation = continuation or {'run_id': str(uuid.uuid4()), 'sequence': 0}
+        schedule_continuation(context, {
+            'run_id': continuation['run_id'],
+            'sequence': continuation['sequence'] + 1
+        })
 
     return articles_with_summaries
 
+def get_article_by_id(article_id, source):
+    """Load a single article from storage, or None if it does not exist"""
+    if STORAGE_TYPE == 's3':
+        try:
+            response = s3_client.get_object(Bucket=NEWS_BUCKET_NAME, Key=f"{ARTICLES_PREFIX}{source}/{article_id}.json")
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code', '') in ['NoSuchKey', '404']:
+                return None
+            raise
+        return json.loads(response['Body'].read().decode('utf-8'))
+
+    return news_table.get_item(Key={'id': article_id}).get('Item')
+
+def process_queue_records(records, context=None):
+    """Process a batch of SQS messages from the collector's article queue
+
+    Each message carries an article id and source. Articles that are missing
+    or already processed, and repeat messages for an article earlier in the
+    same batch, are acknowledged; messages whose article could not be
+    summarized and stored are returned as batch item failures so SQS
+    redelivers only those.
+    """
+    articles = []
+    message_ids = []
+    failures = []
+    article_ids = set()
+
+    for record in records:
+        try:
+            message = json.loads(record['body'])
+            article = get_article_by_id(message['id'], message.get('source'))
+        except Exception as e:
+            print(f"Error loading article for message {record.get('messageId')}: {str(e)}")
+            failures.append(record['messageId'])
+            continue
+
+        if article is None or article.get('processed', False) or article['id'] in article_ids:
+            # Deliveries are at-least-once, so duplicates are expected
+            continue
+
+        article_ids.add(article['id'])
+        articles.append(article)
+        message_ids.append(record['messageId'])
+
+    print(f"Received {len(records)} queued articles, {len(articles)} to summarize")
+    notifier = create_notifier()
+    try:
+        completed, _ = summarize_articles(articles, context, notifier)
+    finally:
+        if notifier:
+            notifier.close()
+
+    failures.extend(message_id for index, message_id in enumerate(message_ids) if index not in completed)
+    articles_with_summaries = [completed[index] for index in sorted(completed)]
+    if not notifier:
+        send_notifications(articles_with_summaries)
+
+    return articles_with_summaries, failures
+
+def is_sqs_event(event):
+    """Check whether the event is a batch of SQS messages"""
+    records = event.get('Records') or []
+    return bool(records) and records[0].get('eventSource') == 'aws:sqs'
+
+class S3BatchJobRunner:
+    """Runs Bedrock batch inference jobs with their files in the news bucket"""
+
+    def __init__(self, bucket, role_arn):
+        self.bucket = bucket
+        self.role_arn = role_arn
+
+    def write_file(self, key, body):
+        s3_client.put_object(Bucket=self.bucket, Key=key, Body=body.encode('utf-8'))
+
+    def read_file(self, key):
+        response = s3_client.get_object(Bucket=self.bucket, Key=key)
+        return response['Body'].read().decode('utf-8')
+
+    def list_files(self, prefix):
+        keys = []
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return keys
+
+    def delete_file(self, key):
+        s3_client.delete_object(Bucket=self.bucket, Key=key)
+
+    def submit_job(self, job_name, input_key, output_prefix):
+        response = bedrock_client.create_model_invocation_job(
+            jobName=job_name,
+            roleArn=self.role_arn,
+            modelId=BEDROCK_MODEL_ID,
+            inputDataConfig={'s3InputDataConfig': {'s3Uri': f"s3://{self.bucket}/{input_key}", 's3InputFormat': 'JSONL'}},
+            outputDataConfig={'s3OutputDataConfig': {'s3Uri': f"s3://{self.bucket}/{output_prefix}"}}
+        )
+        return response['jobArn']
+
+    def get_job_status(self, job_id):
+        return bedrock_client.get_model_invocation_job(jobIdentifier=job_id)['status']
+
+    def get_output_key(self, job):
+        # Bedrock writes <output prefix>/<job id>/<input file name>.out
+        return f"{job['output_prefix']}{job['job_id'].split('/')[-1]}/{job['input_key'].split('/')[-1]}.out"
+
+class LocalBatchJobRunner(S3BatchJobRunner):
+    """File-based stand-in for Bedrock batch inference
+
+    Files live under a local directory with the same layout as in S3. A job
+    "runs" the first time its status is checked: every input record gets a
+    modelOutput from `model_fn`, which by default returns a placeholder
+    response, so the whole submit/ingest flow can be exercised without AWS.
+    """
+
+    def __init__(self, root_dir, model_fn=None):
+        self.root_dir = root_dir
+        self.model_fn = model_fn or local_batch_model_output
+
+    def _path(self, key):
+        return os.path.join(self.root_dir, *key.split('/'))
+
+    def write_file(self, key, body):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(body)
+
+    def read_file(self, key):
+        with open(self._path(key), encoding='utf-8') as f:
+            return f.read()
+
+    def list_files(self, prefix):
+        keys = []
+        for dir_path, _, file_names in os.walk(self.root_dir):
+            for file_name in file_names:
+                key = os.path.relpath(os.path.join(dir_path, file_name), self.root_dir).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def delete_file(self, key):
+        os.remove(self._path(key))
+
+    def submit_job(self, job_name, input_key, output_prefix):
+        job_id = f"local-batch-job/{job_name}"
+        self.write_file(f"{output_prefix}.status", 'Submitted')
+        return job_id
+
+    def get_job_status(self, job_id):
+        job_name = job_id.split('/')[-1]
+        output_prefix = f"{BATCH_JOB_PREFIX}{job_name}/output/"
+        status_key = f"{output_prefix}.status"
+        if self.read_file(status_key) == 'Submitted':
+            input_key = f"{BATCH_JOB_PREFIX}{job_name}/input/records.jsonl"
+            output_lines = []
+            for line in self.read_file(input_key).splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    record['modelOutput'] = self.model_fn(record['modelInput'])
+                    output_lines.append(json.dumps(record, ensure_ascii=False))
+            self.write_file(self.get_output_key({'job_id': job_id, 'input_key': input_key, 'output_prefix': output_prefix}),
+                            '\n'.join(output_lines) + '\n')
+            self.write_file(status_key, 'Completed')
+        return self.read_file(status_key)
+
+def local_batch_model_output(model_input):
+    """Placeholder model response used by the local batch job runner"""
+    prompt = model_input['messages'][0]['content'] if 'messages' in model_input else model_input.get('prompt', '')
+    text = f"[Local batch summary] {prompt.splitlines()[0] if prompt else ''}"
+    if MODEL_FAMILY == 'claude':
+        return {'content': [{'type': 'text', 'text': text}]}
+    return {'completion': text}
+
+def get_batch_job_runner():
+    """Create the batch job runner selected by BATCH_JOB_RUNNER"""
+    if BATCH_JOB_RUNNER == 'local':
+        return LocalBatchJobRunner(BATCH_JOB_LOCAL_DIR)
+    return S3BatchJobRunner(NEWS_BUCKET_NAME, BATCH_JOB_ROLE_ARN)
+
+def get_batch_record_id(position):
+    """Batch inference record ID for the article at `position` in a job
+
+    Bedrock expects 11-character alphanumeric record IDs, so articles are
+    numbered by their position in the job record rather than by article ID.
+    """
+    return f"{position:011d}"
+
+def submit_batch_job(runner, articles):
+    """Write pending articles as a batch inference JSONL input and submit the job
+
+    The articles themselves are kept in a job record under the jobs/ prefix so
+    the ingest step can store the summaries without reading them back.
+    """
+    job_name = f"news-summaries-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+    input_key = f"{BATCH_JOB_PREFIX}{job_name}/input/records.jsonl"
+    output_prefix = f"{BATCH_JOB_PREFIX}{job_name}/output/"
+
+    reset_content_budget_stats()
+    records = [
+        json.dumps({
+            'recordId': get_batch_record_id(position),
+            'modelInput': build_request_body(build_article_prompt(article, OUTPUT_LANGUAGE), cache_prompt=False)
+        }, ensure_ascii=False)
+        for position, article in enumerate(articles)
+    ]
+    runner.write_file(input_key, '\n'.join(records) + '\n')
+    print(f"Content trimmed to the input budget for {content_budget_stats['articles_trimmed']} articles "
+          f"(~{content_budget_stats['tokens_trimmed']} tokens)")
+
+    job_id = runner.submit_job(job_name, input_key, output_prefix)
+    runner.write_file(f"{BATCH_JOB_PREFIX}jobs/{job_name}.json", json.dumps({
+        'job_name': job_name,
+        'job_id': job_id,
+        'input_key': input_key,
+        'output_prefix': output_prefix,
+        'articles': articles,
+        'submitted_at': datetime.datetime.now().isoformat()
+    }, ensure_ascii=False, default=str))
+
+    print(f"Submitted batch inference job {job_id} for {len(articles)} articles")
+    return job_id
+
+def ingest_batch_jobs(runner):
+    """Store the summaries of finished batch jobs
+
+    Returns the articles stored with their summaries and the IDs of articles
+    still owned by running jobs. Articles of failed jobs, or without a usable
+    record in the output, stay pending and are picked up by a later run.
+    Errors are handled per job: a job whose status cannot be read is retried
+    on the next run, and a finished job whose output cannot be ingested is
+    dropped so it does not block later runs.
+    """
+    articles_with_summaries = []
+    outstanding_ids = set()
+
+    for job_key in runner.list_files(f"{BATCH_JOB_PREFIX}jobs/"):
+        try:
+            job = json.loads(runner.read_file(job_key))
+            status = runner.get_job_status(job['job_id'])
+        except Exception as e:
+            print(f"Error checking batch inference job {job_key}: {str(e)}")
+            continue
+
+        if status in BATCH_JOB_RUNNING_STATUSES:
+            print(f"Batch inference job {job['job_name']} is {status}")
+            outstanding_ids.update(article['id'] for article in job['articles'])
+            continue
+
+        if status in ['Completed', 'PartiallyCompleted']:
+            try:
+                articles_with_summaries.extend(ingest_batch_job_output(runner, job))
+            except Exception as e:
+                print(f"Error ingesting batch inference job {job['job_name']}, its articles stay pending: {str(e)}")
+        else:
+            print(f"Batch inference job {job['job_name']} ended with status {status}")
+
+        try:
+            runner.delete_file(job_key)
+        except Exception as e:
+            print(f"Error deleting batch inference job record {job_key}: {str(e)}")
+
+    print(f"Ingested {len(articles_with_summaries)} summaries from batch inference jobs")
+    return articles_with_summaries, outstanding_ids
+
+def ingest_batch_job_output(runner, job):
+    """Store the summaries in a finished job's output and return the stored articles"""
+    outputs = {}
+    for line in runner.read_file(runner.get_output_key(job)).splitlines():
+        if line.strip():
+            record = json.loads(line)
+            outputs[record.get('recordId')] = record
+
+    articles_with_summaries = []
+    for position, article in enumerate(job['articles']):
+        record = outputs.get(get_batch_record_id(position), {})
+        if 'modelOutput' not in record:
+            print(f"No batch output for article: {article.get('title', 'No Title')}")
+            continue
+
+        summary = extract_response_text(record['modelOutput'])
+        if is_cacheable_summary(summary):
+            save_summary_to_cache(get_summary_cache_key(article, OUTPUT_LANGUAGE), summary)
+        if store_summary(article, summary):
+            article_with_summary = article.copy()
+            article_with_summary['summary'] = summary
+            articles_with_summaries.append(article_with_summary)
+    return articles_with_summaries
+
+def process_articles_with_batch_job(context=None):
+    """Process the backlog through Bedrock batch inference
+
+    Finished jobs are ingested and notified first. The remaining pending
+    articles go into a new job when there are at least BATCH_JOB_MIN_RECORDS of
+    them; smaller backlogs are summarized on demand instead.
+    """
+    runner = get_batch_job_runner()
+    articles_with_summaries, outstanding_ids = ingest_batch_jobs(runner)
+
+    # Get unprocessed articles based on storage type
+    if STORAGE_TYPE == 's3':
+        unprocessed_articles = get_unprocessed_articles_from_s3()
+    else:  # default to dynamodb
+        unprocessed_articles = get_unprocessed_articles_from_dynamodb()
+    unprocessed_articles = select_stale_articles(unprocessed_articles)
+
+    pending_articles = [article for article in unprocessed_articles if article['id'] not in outstanding_ids]
+    print(f"Found {len(pending_articles)} unprocessed articles not already in a batch job")
+
+    if len(pending_articles) >= BATCH_JOB_MIN_RECORDS:
+        submit_batch_job(runner, pending_articles)
+    elif pending_articles:
+        completed, _ = summarize_articles(pending_articles, context)
+        articles_with_summaries.extend(completed[index] for index in sorted(completed))
+
+    send_notifications(articles_with_summaries)
+    return articles_with_summaries
+
 def lambda_handler(event, context):
     try:
         start_time = datetime.datetime.now()
         print(f"Lambda function started at: {start_time.isoformat()}")
 
+        # Queue-driven mode: report failed messages so only those are retried
+        if is_sqs_event(event):
+            processed_articles, failures = process_queue_records(event['Records'], context)
+            print(f"Processed {len(processed_articles)} queued articles, {len(failures)} failed")
+            return {
+                'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]
+            }
+
         # Check if this is an API Gateway event
         is_api_event = event.get('httpMethod') is not None
 
-        # Process articles
-        processed_articles = process_articles()
+        # Process articles, resuming a previous run if this is a continuation
+        if PROCESSING_MODE == 'batch_job':
+            processed_articles = process_articles_with_batch_job(context)
+        else:
+            processed_articles = process_articles(context, event.get('continuation'))
 
         end_time = datetime.datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -515,6 +1800,10 @@ def lambda_handler(event, context):
         error_message = f"Error: {str(e)}"
         print(error_message)
 
+        # Let Lambda retry the whole SQS batch rather than acknowledging it
+        if is_sqs_event(event):
+            raise
+
         # Format error response for API Gateway if needed
         if event.get('httpMethod') is not None:
             return {
@@ -1,10 +1,17 @@
 import json
 import os
-import boto3
+import sys
 import uuid
 
-# Initialize AWS Lambda client
-lambda_client = boto3.client('lambda')
+try:
+    import aws_clients
+except ImportError:
+    # Running from the repository rather than a built package
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+    import aws_clients
+
+# AWS Lambda client, created on first use and reused across warm invocations
+lambda_client = aws_clients.lazy_client('lambda')
 
 def lambda_handler(event, context):
     """Handler for the async process endpoint"""
@@ -0,0 +1,107 @@
+"""Shared boto3 client factory for the news Lambda functions
+
+Clients and resources are created on first use and cached for the life of
+the container, so warm invocations reuse them and their connection pools.
+boto3 is only imported when the first client is actually needed, which keeps
+it out of the import time of functions (or code paths) that never call AWS.
+"""
+import os
+import threading
+
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '5'))  # Seconds to establish a connection
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '60'))  # Seconds to wait for a response
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '10'))  # Kept-alive connections per client
+
+# Services whose calls routinely take longer than AWS_READ_TIMEOUT
+SERVICE_READ_TIMEOUTS = {
+    'bedrock-runtime': 300  # Long summaries are generated before the response starts
+}
+
+_lock = threading.RLock()  # get_table creates the dynamodb resource while holding it
+_cache = {}
+_stand_ins = {}
+
+def build_config(service_name, max_pool_connections=None):
+    """Build the botocore Config shared by all clients of a service
+
+    The connection pool is never smaller than AWS_MAX_POOL_CONNECTIONS, so
+    callers only pass max_pool_connections when they run more threads than
+    that against one client.
+    """
+    from botocore.config import Config
+
+    return Config(
+        connect_timeout=AWS_CONNECT_TIMEOUT,
+        read_timeout=SERVICE_READ_TIMEOUTS.get(service_name, AWS_READ_TIMEOUT),
+        max_pool_connections=max(AWS_MAX_POOL_CONNECTIONS, max_pool_connections or 0),
+        tcp_keepalive=True
+    )
+
+def _get_or_create(key, create):
+    with _lock:
+        if key not in _cache:
+            _cache[key] = create()
+        return _cache[key]
+
+def use_stand_in(service_name, stand_in):
+    """Serve `stand_in` instead of a boto3 client or resource for a service
+
+    Meant for local tools such as the benchmark harness; must be called before
+    the first client for the service is created.
+    """
+    _stand_ins[service_name] = stand_in
+
+def get_client(service_name, max_pool_connections=None):
+    """Return the cached boto3 client for a service, creating it on first use"""
+    def create():
+        if service_name in _stand_ins:
+            return _stand_ins[service_name]
+        import boto3
+        return boto3.client(service_name, config=build_config(service_name, max_pool_connections))
+
+    return _get_or_create(('client', service_name, max_pool_connections), create)
+
+def get_resource(service_name, max_pool_connections=None):
+    """Return the cached boto3 resource for a service, creating it on first use"""
+    def create():
+        if service_name in _stand_ins:
+            return _stand_ins[service_name]
+        import boto3
+        return boto3.resource(service_name, config=build_config(service_name, max_pool_connections))
+
+    return _get_or_create(('resource', service_name, max_pool_connections), create)
+
+def get_table(table_name):
+    """Return the cached DynamoDB Table resource for a table name"""
+    return _get_or_create(('table', table_name), lambda: get_resource('dynamodb').Table(table_name))
+
+class LazyClient:
+    """Module-level stand-in that creates the real client on first attribute access
+
+    Lambda modules assign these at import time in place of eagerly created
+    clients, so existing call sites such as `s3_client.put_object(...)` stay
+    unchanged while the client is only built when a code path uses it.
+    """
+
+    def __init__(self, factory, *args, **kwargs):
+        self._factory = factory
+        self._args = args
+        self._kwargs = kwargs
+        self._target = None
+
+    def __getattr__(self, name):
+        if self._target is None:
+            self._target = self._factory(*self._args, **self._kwargs)
+        return getattr(self._target, name)
+
+def lazy_client(service_name, max_pool_connections=None):
+    """Lazy stand-in for get_client(service_name)"""
+    return LazyClient(get_client, service_name, max_pool_connections)
+
+def lazy_resource(service_name, max_pool_connections=None):
+    """Lazy stand-in for get_resource(service_name)"""
+    return LazyClient(get_resource, service_name, max_pool_connections)
+
+def lazy_table(table_name):
+    """Lazy stand-in for get_table(table_name)"""
+    return LazyClient(get_table, table_name)
@@ -0,0 +1,167 @@
+"""Keep-alive HTTP client for Slack incoming webhooks
+
+One connection per webhook host is kept open and reused for every message,
+including across warm invocations, so only the first post pays for the TCP
+and TLS handshakes. Posts have connect/read timeouts, honour Retry-After on
+429 responses and are retried a bounded number of times.
+"""
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+SLACK_CONNECT_TIMEOUT = float(os.environ.get('SLACK_CONNECT_TIMEOUT', '5'))  # Seconds to connect to the webhook host
+SLACK_READ_TIMEOUT = float(os.environ.get('SLACK_READ_TIMEOUT', '10'))  # Seconds to wait for a webhook response
+SLACK_MAX_RETRIES = int(os.environ.get('SLACK_MAX_RETRIES', '3'))  # Retries per Slack message
+SLACK_MAX_RETRY_AFTER = float(os.environ.get('SLACK_MAX_RETRY_AFTER', '30'))  # Longest Retry-After wait honoured, in seconds
+SLACK_MAX_BLOCKS = 50  # Slack rejects messages with more blocks than this
+SLACK_MAX_PAYLOAD_BYTES = int(os.environ.get('SLACK_MAX_PAYLOAD_BYTES', '40000'))  # Size limit for each Slack message payload
+
+# Errors showing the server closed a kept-alive connection before our request
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+class WebhookConnection:
+    """A reusable connection to one webhook host"""
+
+    def __init__(self, scheme, netloc):
+        self.connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        self.netloc = netloc
+        self.lock = threading.Lock()
+        self._connection = None
+
+    def post(self, path, body):
+        """POST a body and return (status, headers, response text)
+
+        A kept-alive connection may have been closed by the server while the
+        function was idle, so a request that fails on a reused connection with
+        a closed-connection error is sent once more on a new one. Other errors,
+        such as a read timeout, are raised for the caller to retry.
+        """
+        with self.lock:
+            reused = self._connection is not None
+            try:
+                return self._post(path, body)
+            except STALE_CONNECTION_ERRORS:
+                self.close()
+                if not reused:
+                    raise
+            return self._post(path, body)
+
+    def _post(self, path, body):
+        if self._connection is None:
+            connection = self.connection_class(self.netloc, timeout=SLACK_CONNECT_TIMEOUT)
+            connection.connect()
+            connection.sock.settimeout(SLACK_READ_TIMEOUT)
+            self._connection = connection
+
+        try:
+            self._connection.request('POST', path, body=body, headers={'Content-Type': 'application/json; charset=utf-8'})
+            response = self._connection.getresponse()
+            text = response.read().decode('utf-8')
+        except Exception:
+            self.close()
+            raise
+
+        if response.will_close:
+            self.close()
+        return response.status, response.headers, text
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+# Connections by webhook host, reused across warm invocations
+_connections = {}
+_connections_lock = threading.Lock()
+
+def get_connection(webhook_url):
+    """Return the shared connection for the host of a webhook URL"""
+    url = urllib.parse.urlparse(webhook_url)
+    key = (url.scheme, url.netloc)
+    with _connections_lock:
+        if key not in _connections:
+            _connections[key] = WebhookConnection(url.scheme, url.netloc)
+        return _connections[key]
+
+def get_block_size(block):
+    """Encoded size of a block inside a message payload, including its separator
+
+    Payloads are sent as UTF-8 without ASCII escapes, so Japanese text counts
+    its real size rather than six bytes per character.
+    """
+    return len(json.dumps(block, ensure_ascii=False).encode('utf-8')) + 2
+
+def pack_block_groups(block_groups, reserved_blocks=None):
+    """Split groups of blocks into as few Slack messages as the limits allow
+
+    Groups (e.g. all blocks of one article) are kept whole and in order.
+    `reserved_blocks` are blocks the caller adds to every message, such as a
+    header, and count against each message's limits. Returns one list of group
+    indexes per message.
+    """
+    reserved_blocks = reserved_blocks or []
+    base_bytes = len(json.dumps({"blocks": []}, ensure_ascii=False).encode('utf-8')) + sum(get_block_size(block) for block in reserved_blocks)
+
+    messages = []
+    current, block_count, payload_bytes = [], len(reserved_blocks), base_bytes
+    for index, group in enumerate(block_groups):
+        group_bytes = sum(get_block_size(block) for block in group)
+        if current and (block_count + len(group) > SLACK_MAX_BLOCKS or payload_bytes + group_bytes > SLACK_MAX_PAYLOAD_BYTES):
+            messages.append(current)
+            current, block_count, payload_bytes = [], len(reserved_blocks), base_bytes
+
+        current.append(index)
+        block_count += len(group)
+        payload_bytes += group_bytes
+
+    if current:
+        messages.append(current)
+    return messages
+
+def get_retry_delay(attempt, headers=None):
+    """Seconds to wait before a retry: Retry-After when given, otherwise exponential backoff"""
+    retry_after = headers.get('Retry-After') if headers else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), SLACK_MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return float(2 ** attempt)
+
+def post_message(webhook_url, message, description='Slack message'):
+    """Post a message payload to a Slack webhook
+
+    Rate limiting (429), server errors and connection errors are retried up
+    to SLACK_MAX_RETRIES times; other 4xx responses are not. Returns True
+    when Slack accepted the message.
+    """
+    url = urllib.parse.urlparse(webhook_url)
+    path = url.path + (f"?{url.query}" if url.query else '')
+    body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    connection = get_connection(webhook_url)
+
+    for attempt in range(SLACK_MAX_RETRIES + 1):
+        headers = None
+        try:
+            status, headers, text = connection.post(path, body)
+            if status == 200:
+                print(f"{description} sent successfully: {text}")
+                return True
+
+            error = f"HTTP {status}: {text}"
+            if status < 500 and status != 429:
+                print(f"Error sending {description}: {error}")
+                return False
+        except (http.client.HTTPException, OSError) as e:
+            error = str(e)
+
+        if attempt == SLACK_MAX_RETRIES:
+            print(f"Giving up on {description} after {SLACK_MAX_RETRIES} retries: {error}")
+            return False
+
+        delay = get_retry_delay(attempt, headers)
+        print(f"Error sending {description}: {error}. Retry {attempt + 1}/{SLACK_MAX_RETRIES} in {delay:.1f} seconds")
+        time.sleep(delay)
@@ -1,9 +1,16 @@
-import boto3
 import json
 import logging
 import os
-import urllib.request
-import urllib.parse
+import sys
+
+try:
+    import aws_clients
+    import slack_client
+except ImportError:
+    # Running from the repository rather than a built package
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+    import aws_clients
+    import slack_client
 
 # Set up logging
 logger = logging.getLogger()
@@ -11,15 +18,64 @@ logger.setLevel(logging.INFO)
 
 # Slack Webhook URL - environment variable
 SLACK_WEBHOOK_URL = os.environ['SLACK_WEBHOOK_URL']
+# Where claim-checked digests may be loaded from; must match news_processor
+NEWS_BUCKET_NAME = os.environ.get('NEWS_BUCKET_NAME')
+CLAIM_CHECK_STORAGE = os.environ.get('CLAIM_CHECK_STORAGE', 's3')  # 's3' or 'local'
+CLAIM_CHECK_LOCAL_DIR = os.environ.get('CLAIM_CHECK_LOCAL_DIR', '/tmp/news-notifications')
 
 def lambda_handler(event, context):
-    """Lambda function to send SNS messages to Slack"""
-    logger.info("Received event: " + json.dumps(event))
-    
-    # Extract SNS message
-    message = event['Records'][0]['Sns']['Message']
-    subject = event['Records'][0]['Sns']['Subject']
-    
+    """Lambda function to send SNS messages to Slack
+
+    Every record in the event is formatted, and the blocks of all records are
+    coalesced into as few Slack messages as Slack's limits allow.
+    """
+    records = [record for record in event.get('Records', []) if 'Sns' in record]
+    logger.info(f"Received {len(records)} SNS records: {[record['Sns'].get('MessageId') for record in records]}")
+
+    block_groups = []
+    for record in records:
+        block_groups.extend(format_record(record['Sns']))
+
+    if not block_groups:
+        return {
+            'statusCode': 200,
+            'body': json.dumps('No SNS messages to send')
+        }
+
+    # Send to Slack
+    messages = [
+        {"blocks": [block for index in group_indexes for block in block_groups[index]]}
+        for group_indexes in slack_client.pack_block_groups(block_groups)
+    ]
+    logger.info(f"Sending {len(records)} SNS records as {len(messages)} Slack messages")
+    failed = []
+    for index, message in enumerate(messages, 1):
+        try:
+            post_to_slack(message)
+        except RuntimeError:
+            failed.append(index)
+
+    # A retry re-posts every message, so only fail the invocation (and let SNS
+    # retry it) when nothing reached Slack
+    if len(failed) == len(messages):
+        raise RuntimeError(f"None of the {len(messages)} Slack messages could be sent")
+    if failed:
+        logger.error(f"Slack messages {failed} of {len(messages)} could not be sent and will not be retried")
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps('Message sent to Slack!')
+    }
+
+def format_record(sns):
+    """Format one SNS notification as groups of Slack blocks
+
+    Digests too large for SNS arrive as a claim check pointing at the stored
+    digest. If it cannot be loaded the error propagates so SNS retries.
+    """
+    message = sns.get('Message', '')
+    subject = sns.get('Subject')
+
     try:
         # Try to parse message as JSON
         message_data = json.loads(message)
@@ -27,50 +83,98 @@ def lambda_handler(event, context):
         if isinstance(message_data, str):
             # This might be the lambda field from our SNS message
             message_data = json.loads(message_data)
-        
-        formatted_message = format_message(message_data, subject)
     except Exception as e:
-        logger.info(f"Message is not JSON formatted or has unexpected format: {e}")
-        # If not JSON or not in expected format, treat as plain text
-        formatted_message = {
-            "blocks": [
-                {
-                    "type": "header",
-                    "text": {
-                        "type": "plain_text",
-                        "text": subject or "AWS News Summary"
-                    }
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": message
-                    }
-                }
-            ]
-        }
-    
-    # Send to Slack
-    response = post_to_slack(formatted_message)
-    
-    return {
-        'statusCode': 200,
-        'body': json.dumps('Message sent to Slack!')
-    }
+        logger.info(f"Message is not JSON formatted: {e}")
+        return format_plain_text(message, subject)
 
-def format_message(message_data, subject):
-    """Format the SNS message as a Slack message with blocks"""
-    blocks = [
+    if isinstance(message_data, dict) and 'claim_check' in message_data:
+        try:
+            pointer = validate_claim_check(message_data['claim_check'])
+        except ValueError as e:
+            logger.error(f"Ignoring SNS message {sns.get('MessageId')}: {e}")
+            return []
+        message_data = load_claim_check(pointer)
+        subject = message_data.get('subject', subject)
+
+    try:
+        return format_message(message_data, subject)
+    except Exception as e:
+        logger.info(f"Message has unexpected format: {e}")
+        # If not in expected format, treat as plain text
+        return format_plain_text(message, subject)
+
+def format_plain_text(message, subject):
+    """Format a message that is not a digest as a header and a text section"""
+    return [[
         {
             "type": "header",
             "text": {
                 "type": "plain_text",
                 "text": subject or "AWS News Summary"
             }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": message
+            }
         }
-    ]
-    
+    ]]
+
+def validate_claim_check(pointer):
+    """Check that a claim check points at this function's own digest storage
+
+    Only the configured news bucket is read, and local files only when the
+    function itself runs with CLAIM_CHECK_STORAGE=local and only under
+    CLAIM_CHECK_LOCAL_DIR. Raises ValueError otherwise.
+    """
+    if not isinstance(pointer, dict):
+        raise ValueError("claim check is not an object")
+
+    if pointer.get('storage') == 'local':
+        if CLAIM_CHECK_STORAGE != 'local':
+            raise ValueError("local claim checks are not enabled")
+        root = os.path.realpath(CLAIM_CHECK_LOCAL_DIR)
+        path = os.path.realpath(str(pointer.get('path', '')))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"claim check path is outside {CLAIM_CHECK_LOCAL_DIR}")
+        return {'storage': 'local', 'path': path}
+
+    if pointer.get('storage') != 's3' or CLAIM_CHECK_STORAGE != 's3':
+        raise ValueError(f"unsupported claim check storage: {pointer.get('storage')}")
+    if not NEWS_BUCKET_NAME or pointer.get('bucket') != NEWS_BUCKET_NAME:
+        raise ValueError(f"claim check bucket {pointer.get('bucket')} is not the configured news bucket")
+    if not str(pointer.get('key', '')).startswith('notifications/'):
+        raise ValueError("claim check key is outside notifications/")
+    return pointer
+
+def load_claim_check(pointer):
+    """Load a digest stored by the processor from S3 or local storage"""
+    if pointer.get('storage') == 'local':
+        logger.info(f"Loading notification digest from {pointer['path']}")
+        with open(pointer['path'], encoding='utf-8') as f:
+            return json.load(f)
+
+    logger.info(f"Loading notification digest from s3://{pointer['bucket']}/{pointer['key']}")
+    response = aws_clients.get_client('s3').get_object(Bucket=pointer['bucket'], Key=pointer['key'])
+    return json.loads(response['Body'].read().decode('utf-8'))
+
+def format_message(message_data, subject):
+    """Format the SNS message as groups of Slack blocks
+
+    Each article is a group of its own, so an article is never split across
+    Slack messages, and the header shares a group with the first article so
+    it never ends up at the bottom of a message without them.
+    """
+    header = {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": subject or "AWS News Summary"
+        }
+    }
+
     # Determine if message_data is an array of articles or something else
     if isinstance(message_data, list):
         articles = message_data
@@ -78,25 +182,29 @@ def format_message(message_data, subject):
         articles = message_data['articles']
     else:
         # Just display the raw data if it doesn't match expected format
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": json.dumps(message_data, ensure_ascii=False, indent=2)
+        return [[
+            header,
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": json.dumps(message_data, ensure_ascii=False, indent=2)
+                }
             }
-        })
-        return {"blocks": blocks}
-    
+        ]]
+
+    block_groups = [[header]]
+
     # Add each article as blocks
     for article in articles:
         title = article.get('title', 'No Title')
         source = article.get('source', 'Unknown Source')
         summary = article.get('summary', 'No summary available')
         link = article.get('link', '#')
-        
+
         # Add a divider
-        blocks.append({"type": "divider"})
-        
+        blocks = [{"type": "divider"}]
+
         # Add title and source
         blocks.append({
             "type": "section",
@@ -105,11 +213,11 @@ def format_message(message_data, subject):
                 "text": f"*{title}*\n_Source: {source}_"
             }
         })
-        
+
         # Add summary (truncate if too long for Slack)
         if len(summary) > 2900:
             summary = summary[:2900] + "..."
-            
+
         blocks.append({
             "type": "section",
             "text": {
@@ -117,7 +225,7 @@ def format_message(message_data, subject):
                 "text": summary
             }
         })
-        
+
         # Add link if available
         if link and link != '#':
             blocks.append({
@@ -127,21 +235,17 @@ def format_message(message_data, subject):
                     "text": f"<{link}|Read Full Announcement>"
                 }
             })
-    
-    return {"blocks": blocks}
+
+        block_groups.append(blocks)
+
+    if len(block_groups) > 1:
+        header_group = block_groups.pop(0)
+        block_groups[0] = header_group + block_groups[0]
+    return block_groups
 
 def post_to_slack(message):
-    """Post message to Slack webhook"""
-    data = json.dumps(message).encode('utf-8')
-    req = urllib.request.Request(
-        SLACK_WEBHOOK_URL,
-        data=data,
-        headers={'Content-Type': 'application/json'}
-    )
-    
-    try:
-        with urllib.request.urlopen(req) as response:
-            return response.read()
-    except Exception as e:
-        logger.error(f"Error posting to Slack: {e}")
-        raise
\ No newline at end of file
+    """Post message to Slack webhook over the shared keep-alive connection"""
+    if not slack_client.post_message(SLACK_WEBHOOK_URL, message):
+        logger.error("Error posting to Slack")
+        raise RuntimeError("Slack webhook did not accept the message")
+    return True
\ No newline at end of file
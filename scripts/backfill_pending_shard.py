@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Backfill pending_shard on unprocessed articles stored before the pending index
+
+The processor only reads the backlog from the sparse
+pending_shard-published_date-index GSI, so unprocessed items written before the
+collector set pending_shard are never picked up. This one-off script scans the
+table for items with processed = false and no pending_shard and sets the
+attribute, using the same shard formula as the collector.
+
+Usage: python3 scripts/backfill_pending_shard.py [--table NAME] [--shard-count N] [--dry-run]
+"""
+import argparse
+import zlib
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+def get_pending_shard(article_id, shard_count):
+    """Pending-index partition for an article; must match the collector's get_pending_shard"""
+    return str(zlib.crc32(article_id.encode('utf-8')) % shard_count)
+
+def iter_unindexed_articles(table):
+    """Yield the ids of unprocessed items without a pending_shard, following pagination"""
+    scan_kwargs = {
+        'FilterExpression': Attr('processed').eq(False) & Attr('pending_shard').not_exists(),
+        'ProjectionExpression': 'id'
+    }
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            yield item['id']
+
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            break
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+def backfill(table, shard_count, dry_run=False):
+    """Set pending_shard on every unindexed unprocessed item and return how many were updated"""
+    updated = 0
+    for article_id in iter_unindexed_articles(table):
+        shard = get_pending_shard(article_id, shard_count)
+        if dry_run:
+            print(f"Would set pending_shard={shard} on {article_id}")
+            updated += 1
+            continue
+
+        try:
+            # Skip items the processor finished since the scan
+            table.update_item(
+                Key={'id': article_id},
+                UpdateExpression='SET pending_shard = :shard',
+                ConditionExpression='processed = :unprocessed AND attribute_not_exists(pending_shard)',
+                ExpressionAttributeValues={':shard': shard, ':unprocessed': False}
+            )
+            updated += 1
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code', '') != 'ConditionalCheckFailedException':
+                raise
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--table', default='NewsArticles', help='articles table (default: NewsArticles)')
+    parser.add_argument('--shard-count', type=int, default=4, help='PENDING_SHARD_COUNT of the collector (default: 4)')
+    parser.add_argument('--dry-run', action='store_true', help='list the items without updating them')
+    args = parser.parse_args()
+
+    table = boto3.resource('dynamodb').Table(args.table)
+    updated = backfill(table, args.shard_count, args.dry_run)
+    print(f"{'Found' if args.dry_run else 'Backfilled'} {updated} unprocessed articles without pending_shard")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Benchmark cold starts and invocations of every Lambda entry point
+
+Each run starts a fresh Python process per function (as a Lambda cold start
+does) and measures:
+
+- import_ms: `import lambda_function`
+- first_invocation_ms: the first lambda_handler call, including lazy init
+- warm_invocation_ms: later lambda_handler calls in the same process
+- client_init_ms: creating the real boto3 clients the function used to build
+  eagerly at import time, i.e. the init the shared client factory defers
+
+Handlers run against the in-memory AWS stand-ins in scripts/local_aws.py and
+a local HTTP server that serves the RSS feed and accepts Slack webhooks, so no
+AWS account or network access is needed. Medians are appended to a JSON
+history file and compared with the previous entry to make regressions visible.
+
+Usage: python3 scripts/benchmark_cold_start.py [--runs N] [--warm N] [--history PATH]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPTS_DIR)
+DEFAULT_HISTORY_PATH = os.path.join(PROJECT_ROOT, 'benchmarks', 'cold_start_history.json')
+FEED_ENTRIES = 20  # Announcements served by the local feed
+PROCESSOR_ARTICLES = 3  # Pending articles seeded before each processor invocation
+METRICS = ['import_ms', 'first_invocation_ms', 'warm_invocation_ms', 'client_init_ms']
+
+# Clients each function created at import time before the lazy factory
+EAGER_CLIENTS = {
+    'news_collector': [('client', 's3'), ('resource', 'dynamodb')],
+    'news_processor': [('client', 'bedrock-runtime'), ('client', 'bedrock'), ('client', 's3'),
+                       ('resource', 'dynamodb'), ('client', 'sns'), ('client', 'lambda')],
+    'sns_to_slack': [],
+    'news_processor_async': [('client', 'lambda')]
+}
+
+# Configuration shared by every function; the local server URL is added per run
+BENCHMARK_ENV = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'benchmark',
+    'AWS_SECRET_ACCESS_KEY': 'benchmark',
+    'STORAGE_TYPE': 'dynamodb',
+    'NEWS_BUCKET_NAME': 'benchmark-bucket',
+    'NEWS_TABLE_NAME': 'benchmark-news',
+    'SUMMARY_CACHE_TABLE_NAME': 'benchmark-summary-cache',
+    'BEDROCK_INITIAL_RATE': '1000',  # The stand-in never throttles, so do not pace requests
+    'BEDROCK_MAX_RATE': '1000',
+    'PYTHONDONTWRITEBYTECODE': '1'
+}
+
+class LocalContext:
+    """Minimal Lambda context object"""
+
+    function_name = 'benchmark'
+
+    def get_remaining_time_in_millis(self):
+        return 600000
+
+def seed_pending_articles(table, invocation):
+    """Store new unprocessed articles for the processor to summarize"""
+    for index in range(PROCESSOR_ARTICLES):
+        article_id = f"benchmark-{invocation}-{index}"
+        table.put_item(Item={
+            'id': article_id,
+            'title': f"Local announcement {invocation}-{index}",
+            'link': f"https://aws.amazon.com/about-aws/whats-new/{article_id}/",
+            'content': f"Announcement {invocation}-{index} is now generally available in all commercial Regions.",
+            'source': 'AWS Announcements',
+            'published_date': datetime.datetime.now().isoformat(),
+            'processed': False,
+            'pending_shard': str(index % 4)
+        })
+
+def build_event(function_name):
+    """Build the event a function receives in production"""
+    if function_name == 'sns_to_slack':
+        articles = [
+            {
+                'title': f"Local announcement {index}",
+                'source': 'AWS Announcements',
+                'summary': f"Summary of announcement {index}.",
+                'link': f"https://aws.amazon.com/about-aws/whats-new/local-{index}/"
+            }
+            for index in range(PROCESSOR_ARTICLES)
+        ]
+        return {'Records': [{'Sns': {'Subject': 'AWS News Summary', 'Message': json.dumps(articles)}}]}
+    if function_name == 'news_processor_async':
+        return {'httpMethod': 'POST', 'body': None}
+    return {}
+
+def run_child(function_name, warm_invocations):
+    """Measure one cold start of a function; runs in a fresh interpreter"""
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'lambda', function_name))
+
+    start = time.perf_counter()
+    import lambda_function
+    import_ms = (time.perf_counter() - start) * 1000
+
+    # Register the stand-ins before any handler creates a client
+    import aws_clients
+    import local_aws
+    dynamodb = local_aws.LocalDynamoDB({BENCHMARK_ENV['SUMMARY_CACHE_TABLE_NAME']: 'cache_key'})
+    aws_clients.use_stand_in('s3', local_aws.LocalS3())
+    aws_clients.use_stand_in('dynamodb', dynamodb)
+    aws_clients.use_stand_in('bedrock-runtime', local_aws.LocalBedrockRuntime())
+    aws_clients.use_stand_in('sns', local_aws.LocalSNS())
+    aws_clients.use_stand_in('lambda', local_aws.LocalLambda())
+
+    context = LocalContext()
+    timings = []
+    for invocation in range(warm_invocations + 1):
+        if function_name == 'news_processor':
+            seed_pending_articles(dynamodb.Table(BENCHMARK_ENV['NEWS_TABLE_NAME']), invocation)
+        event = build_event(function_name)
+
+        start = time.perf_counter()
+        lambda_function.lambda_handler(event, context)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    client_init_ms = 0.0
+    if EAGER_CLIENTS[function_name]:
+        start = time.perf_counter()
+        import boto3
+        for kind, service_name in EAGER_CLIENTS[function_name]:
+            create = boto3.client if kind == 'client' else boto3.resource
+            create(service_name, config=aws_clients.build_config(service_name))
+        client_init_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'import_ms': import_ms,
+        'first_invocation_ms': timings[0],
+        'warm_invocation_ms': timings[1:],
+        'client_init_ms': client_init_ms
+    }
+
+def measure(function_name, warm_invocations, env):
+    """Run one cold start of a function in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', function_name, '--warm', str(warm_invocations)],
+        env=env, capture_output=True, text=True
+    )
+    if output.returncode != 0:
+        raise RuntimeError(f"{function_name} benchmark failed:\n{output.stderr}")
+    # Handlers print their own logs, so the result is the last line
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def summarize(results):
+    """Median of each metric over the runs of a function"""
+    summary = {}
+    for metric in METRICS:
+        values = []
+        for result in results:
+            value = result[metric]
+            values.extend(value if isinstance(value, list) else [value])
+        summary[metric] = round(statistics.median(values), 2) if values else None
+    return summary
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+        f.write('\n')
+
+def find_regressions(previous, current, threshold):
+    """List metrics that got slower than the previous entry by more than `threshold` percent"""
+    regressions = []
+    for function_name, metrics in current['results'].items():
+        for metric, value in metrics.items():
+            before = previous['results'].get(function_name, {}).get(metric)
+            if before and value is not None and value > before * (1 + threshold / 100):
+                regressions.append(f"{function_name} {metric}: {before:.1f} -> {value:.1f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per function (default: 5)')
+    parser.add_argument('--warm', type=int, default=3, help='warm invocations after each cold start (default: 3)')
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH, help='JSON history file to append results to')
+    parser.add_argument('--threshold', type=float, default=20.0, help='slowdown in percent reported as a regression (default: 20)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 when a regression is found')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.warm)))
+        return
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    import local_aws
+    server_url = local_aws.start_local_http_server(local_aws.build_feed(FEED_ENTRIES))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry_path = os.path.join(temp_dir, 'feeds.json')
+        with open(registry_path, 'w', encoding='utf-8') as f:
+            json.dump({'feeds': [{'name': 'AWS Announcements', 'url': server_url, 'language': 'en'}]}, f)
+
+        env = dict(os.environ, **BENCHMARK_ENV)
+        env['FEED_REGISTRY_PATH'] = registry_path
+        env['SLACK_WEBHOOK_URL'] = f"{server_url}slack"
+        env['PYTHONPATH'] = os.pathsep.join([os.path.join(PROJECT_ROOT, 'lambda', 'shared'), SCRIPTS_DIR])
+
+        results = {}
+        print(f"{'function':<22}" + ''.join(f"{metric:>21}" for metric in METRICS))
+        for function_name in EAGER_CLIENTS:
+            results[function_name] = summarize([measure(function_name, args.warm, env) for _ in range(args.runs)])
+            print(f"{function_name:<22}" + ''.join(f"{results[function_name][metric]:>21.1f}" for metric in METRICS))
+
+    entry = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': get_git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': args.runs,
+        'warm_invocations': args.warm,
+        'results': results
+    }
+
+    history = load_history(args.history)
+    regressions = find_regressions(history[-1], entry, args.threshold) if history else []
+    history.append(entry)
+    save_history(args.history, history)
+    print(f"Results appended to {args.history}")
+
+    if regressions:
+        print(f"Slower than the previous entry ({history[-2].get('commit')}) by more than {args.threshold:.0f}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
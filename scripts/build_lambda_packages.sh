@@ -54,6 +54,16 @@ for function_name in "${LAMBDA_FUNCTIONS[@]}"; do
     # Copy function code
     cp "$PROJECT_ROOT/lambda/$function_name/lambda_function.py" "$FUNCTION_DIR/"
 
+    # Copy the shared modules (e.g. the boto3 client factory) next to the function code
+    cp "$PROJECT_ROOT/lambda/shared/"*.py "$FUNCTION_DIR/"
+
+    # Copy configuration files shipped with the function (e.g. the feed registry)
+    for config_file in "$PROJECT_ROOT/lambda/$function_name/"*.json; do
+        if [ -f "$config_file" ]; then
+            cp "$config_file" "$FUNCTION_DIR/"
+        fi
+    done
+
     # Check if requirements file exists
     if [ -f "$PROJECT_ROOT/lambda/$function_name/requirements.txt" ]; then
         echo "Installing dependencies for $function_name..."
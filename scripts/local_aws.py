@@ -0,0 +1,201 @@
+"""In-memory stand-ins for the AWS services used by the Lambda functions
+
+Only the calls the functions actually make are implemented. The benchmark
+harness registers them with the shared client factory (aws_clients) so every
+lambda_handler can run end to end without AWS credentials or network access.
+"""
+import http.server
+import io
+import json
+import re
+import threading
+import uuid
+from botocore.exceptions import ClientError
+
+class LocalS3:
+    """Objects kept in a dict keyed by (bucket, key)"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body=b'', **kwargs):
+        self.objects[(Bucket, Key)] = Body.encode('utf-8') if isinstance(Body, str) else Body
+        return {}
+
+    def _get(self, bucket, key, operation_name):
+        if (bucket, key) not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': key}}, operation_name)
+        return self.objects[(bucket, key)]
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self._get(Bucket, Key, 'GetObject'))}
+
+    def head_object(self, Bucket, Key):
+        try:
+            return {'ContentLength': len(self._get(Bucket, Key, 'HeadObject'))}
+        except ClientError:
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def get_paginator(self, operation_name):
+        return LocalS3ListPaginator(self)
+
+class LocalS3ListPaginator:
+    """list_objects_v2 paginator returning every matching key in one page"""
+
+    def __init__(self, s3):
+        self.s3 = s3
+
+    def paginate(self, Bucket, Prefix=''):
+        keys = sorted(key for bucket, key in self.s3.objects if bucket == Bucket and key.startswith(Prefix))
+        yield {'Contents': [{'Key': key} for key in keys]} if keys else {}
+
+class LocalTable:
+    """DynamoDB table with a single hash key, supporting the expressions the functions use"""
+
+    def __init__(self, name, key_name='id'):
+        self.name = name
+        self.key_name = key_name
+        self.items = {}
+
+    def put_item(self, Item, ConditionExpression=None, **kwargs):
+        if ConditionExpression and Item[self.key_name] in self.items:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}}, 'PutItem')
+        self.items[Item[self.key_name]] = dict(Item)
+        return {}
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get(Key[self.key_name])
+        return {'Item': dict(item)} if item else {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames=None, ExpressionAttributeValues=None, **kwargs):
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        item = self.items.setdefault(Key[self.key_name], dict(Key))
+
+        for clause in re.split(r'\s+(?=(?:SET|REMOVE)\s)', UpdateExpression.strip()):
+            action, _, body = clause.partition(' ')
+            for part in body.split(','):
+                if action == 'SET':
+                    name, value = (token.strip() for token in part.split('='))
+                    item[names.get(name, name)] = values[value]
+                elif action == 'REMOVE':
+                    item.pop(names.get(part.strip(), part.strip()), None)
+        return {}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeNames=None, ExpressionAttributeValues=None, **kwargs):
+        """Equality on a single attribute, as used against the sparse pending index"""
+        name, value = (token.strip() for token in KeyConditionExpression.split('='))
+        name = (ExpressionAttributeNames or {}).get(name, name)
+        value = (ExpressionAttributeValues or {})[value]
+        return {'Items': [dict(item) for item in self.items.values() if item.get(name) == value]}
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return LocalBatchWriter(self)
+
+class LocalBatchWriter:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def put_item(self, Item):
+        self.table.put_item(Item=Item)
+
+class LocalDynamoDB:
+    """DynamoDB service resource holding LocalTables by name"""
+
+    def __init__(self, key_names=None):
+        self.key_names = key_names or {}
+        self.tables = {}
+
+    def Table(self, name):
+        if name not in self.tables:
+            self.tables[name] = LocalTable(name, self.key_names.get(name, 'id'))
+        return self.tables[name]
+
+    def batch_get_item(self, RequestItems):
+        responses = {}
+        for name, request in RequestItems.items():
+            table = self.Table(name)
+            responses[name] = [
+                dict(table.items[key[table.key_name]]) for key in request['Keys'] if key[table.key_name] in table.items
+            ]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+class LocalBedrockRuntime:
+    """Returns a fixed summary in the response format of the requested model"""
+
+    def invoke_model(self, modelId, body, **kwargs):
+        request = json.loads(body)
+        if 'messages' in request:
+            text = f"Local summary of: {request['messages'][0]['content'].splitlines()[0]}"
+            response = {
+                'content': [{'type': 'text', 'text': text}],
+                'usage': {'input_tokens': len(body) // 4, 'output_tokens': len(text) // 4}
+            }
+        else:
+            response = {'completion': f"Local summary of: {request.get('prompt', '').splitlines()[0]}"}
+        return {'body': io.BytesIO(json.dumps(response).encode('utf-8'))}
+
+class LocalSNS:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, **kwargs):
+        self.messages.append(kwargs)
+        return {'MessageId': str(uuid.uuid4())}
+
+class LocalLambda:
+    def __init__(self):
+        self.invocations = []
+
+    def invoke(self, **kwargs):
+        self.invocations.append(kwargs)
+        status_code = 202 if kwargs.get('InvocationType') == 'Event' else 200
+        return {'StatusCode': status_code, 'Payload': io.BytesIO(b'{}')}
+
+class LocalHTTPHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the RSS feed on GET and acts as the Slack webhook on POST"""
+
+    feed = b''
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.end_headers()
+        self.wfile.write(self.feed)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+def build_feed(entry_count):
+    """Build an RSS feed with `entry_count` announcements, newest first"""
+    items = ''.join(
+        f"<item><guid>local-{index}</guid><title>Local announcement {index}</title>"
+        f"<link>https://aws.amazon.com/about-aws/whats-new/local-{index}/</link>"
+        f"<description>Announcement {index} is now generally available in all commercial Regions.</description>"
+        f"<pubDate>Mon, 01 Jan 2024 {(entry_count - index) // 60:02d}:{(entry_count - index) % 60:02d}:00 GMT</pubDate></item>"
+        for index in range(entry_count)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Local feed</title>{items}</channel></rss>'.encode('utf-8')
+
+def start_local_http_server(feed):
+    """Start the feed/webhook server on a free port and return its base URL"""
+    handler = type('Handler', (LocalHTTPHandler,), {'feed': feed})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/"
@@ -41,6 +41,7 @@ resource "aws_iam_role_policy" "lambda_s3_policy" {
         Action = [
           "s3:GetObject",
           "s3:PutObject",
+          "s3:DeleteObject",
           "s3:ListBucket"
         ]
         Resource = [
@@ -65,12 +66,41 @@ resource "aws_iam_role_policy" "lambda_dynamodb_policy" {
         Action = [
           "dynamodb:PutItem",
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:UpdateItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
         Resource = [
-          "${aws_dynamodb_table.news_table.arn}"
+          "${aws_dynamodb_table.news_table.arn}",
+          "${aws_dynamodb_table.news_table.arn}/index/*",
+          "${aws_dynamodb_table.summary_cache.arn}"
+        ]
+      }
+    ]
+  })
+}
+
+# Policy for SQS access (queue-driven pipeline)
+resource "aws_iam_role_policy" "lambda_sqs_policy" {
+  count = var.enable_sqs_pipeline ? 1 : 0
+  name  = "lambda_sqs_policy"
+  role  = aws_iam_role.lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:SendMessage",
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Resource = [
+          aws_sqs_queue.article_queue[0].arn
         ]
       }
     ]
@@ -88,9 +118,60 @@ resource "aws_iam_role_policy" "lambda_bedrock_policy" {
       {
         Effect = "Allow"
         Action = [
-          "bedrock:InvokeModel"
+          "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream",
+          "bedrock:CreateModelInvocationJob",
+          "bedrock:GetModelInvocationJob"
         ]
         Resource = "*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "iam:PassRole"
+        ]
+        Resource = aws_iam_role.bedrock_batch_role.arn
+      }
+    ]
+  })
+}
+
+# Service role Bedrock assumes to read and write batch inference files
+resource "aws_iam_role" "bedrock_batch_role" {
+  name = "news_app_bedrock_batch_role"
+
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = "sts:AssumeRole"
+        Effect = "Allow"
+        Principal = {
+          Service = "bedrock.amazonaws.com"
+        }
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy" "bedrock_batch_s3_policy" {
+  name = "bedrock_batch_s3_policy"
+  role = aws_iam_role.bedrock_batch_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:PutObject",
+          "s3:ListBucket"
+        ]
+        Resource = [
+          "${aws_s3_bucket.news_bucket.arn}",
+          "${aws_s3_bucket.news_bucket.arn}/batch-inference/*"
+        ]
       }
     ]
   })
@@ -140,6 +221,24 @@ resource "aws_s3_bucket" "news_bucket" {
   bucket = "news-ai-summarizer-storage"
 }
 
+# Notification digests too large for SNS are only needed until sns_to_slack delivers them
+resource "aws_s3_bucket_lifecycle_configuration" "news_bucket_lifecycle" {
+  bucket = aws_s3_bucket.news_bucket.id
+
+  rule {
+    id     = "expire-notification-digests"
+    status = "Enabled"
+
+    filter {
+      prefix = "notifications/"
+    }
+
+    expiration {
+      days = 14
+    }
+  }
+}
+
 # DynamoDB table for storing news data
 resource "aws_dynamodb_table" "news_table" {
   name         = "NewsArticles"
@@ -161,12 +260,38 @@ resource "aws_dynamodb_table" "news_table" {
     type = "S"
   }
 
+  attribute {
+    name = "pending_shard"
+    type = "S"
+  }
+
   global_secondary_index {
     name            = "source-published_date-index"
     hash_key        = "source"
     range_key       = "published_date"
     projection_type = "ALL"
   }
+
+  # Sparse index of unprocessed articles: the processor removes pending_shard
+  # when an article is summarized, so the index only holds the backlog
+  global_secondary_index {
+    name            = "pending_shard-published_date-index"
+    hash_key        = "pending_shard"
+    range_key       = "published_date"
+    projection_type = "ALL"
+  }
+}
+
+# DynamoDB table caching Bedrock summaries by content hash
+resource "aws_dynamodb_table" "summary_cache" {
+  name         = "NewsSummaryCache"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "cache_key"
+
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
 }
 
 # Lambda layer with dependencies
@@ -191,9 +316,11 @@ resource "aws_lambda_function" "news_collector" {
 
   environment {
     variables = {
-      NEWS_BUCKET_NAME = aws_s3_bucket.news_bucket.bucket
-      NEWS_TABLE_NAME  = aws_dynamodb_table.news_table.name
-      STORAGE_TYPE     = "dynamodb" # or "s3"
+      NEWS_BUCKET_NAME    = aws_s3_bucket.news_bucket.bucket
+      NEWS_TABLE_NAME     = aws_dynamodb_table.news_table.name
+      STORAGE_TYPE        = "dynamodb" # or "s3"
+      PENDING_SHARD_COUNT = "4"
+      ARTICLE_QUEUE_URL   = var.enable_sqs_pipeline ? aws_sqs_queue.article_queue[0].url : ""
     }
   }
 }
@@ -213,16 +340,48 @@ resource "aws_lambda_function" "news_processor" {
 
   environment {
     variables = {
-      NEWS_BUCKET_NAME  = aws_s3_bucket.news_bucket.bucket
-      NEWS_TABLE_NAME   = aws_dynamodb_table.news_table.name
-      STORAGE_TYPE      = "dynamodb" # or "s3"
-      BEDROCK_MODEL_ID  = "anthropic.claude-3-5-sonnet-20241022-v2:0"
-      SLACK_WEBHOOK_URL = var.slack_webhook_url
-      SNS_TOPIC_ARN     = aws_sns_topic.news_updates.arn
+      NEWS_BUCKET_NAME         = aws_s3_bucket.news_bucket.bucket
+      NEWS_TABLE_NAME          = aws_dynamodb_table.news_table.name
+      STORAGE_TYPE             = "dynamodb" # or "s3"
+      BEDROCK_MODEL_ID         = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+      SLACK_WEBHOOK_URL        = var.slack_webhook_url
+      SNS_TOPIC_ARN            = aws_sns_topic.news_updates.arn
+      PENDING_INDEX_NAME       = "pending_shard-published_date-index"
+      PENDING_SHARD_COUNT      = "4"
+      SUMMARY_CACHE_TABLE_NAME = aws_dynamodb_table.summary_cache.name
+      BATCH_JOB_ROLE_ARN       = aws_iam_role.bedrock_batch_role.arn
+      PENDING_MIN_AGE_SECONDS  = var.enable_sqs_pipeline ? "3600" : "0" # Scheduled runs leave new articles to the queue
     }
   }
 }
 
+# SQS queue carrying new article IDs from the collector to the processor
+resource "aws_sqs_queue" "article_queue" {
+  count = var.enable_sqs_pipeline ? 1 : 0
+  name  = "news_articles"
+
+  # AWS recommends six times the processor timeout (600 s)
+  visibility_timeout_seconds = 3600
+  message_retention_seconds  = 345600
+}
+
+# Processor consumes queued articles and reports partial batch failures
+resource "aws_lambda_event_source_mapping" "article_queue_processor" {
+  count            = var.enable_sqs_pipeline ? 1 : 0
+  event_source_arn = aws_sqs_queue.article_queue[0].arn
+  function_name    = aws_lambda_function.news_processor.arn
+  batch_size       = 10
+
+  function_response_types = ["ReportBatchItemFailures"]
+
+  # Every processor instance paces Bedrock on its own, so cap the fan-out
+  scaling_config {
+    maximum_concurrency = var.sqs_max_concurrency
+  }
+
+  depends_on = [aws_iam_role_policy.lambda_sqs_policy]
+}
+
 # EventBridge rule to trigger news collector (daily at 7:00 AM JST / 10:00 PM UTC)
 resource "aws_cloudwatch_event_rule" "daily_news_collection" {
   name                = "daily_news_collection"
@@ -396,11 +555,12 @@ resource "aws_lambda_function" "sns_to_slack" {
   timeout       = 60
   memory_size   = 128
 
-  filename = "${path.module}/../lambda/sns_to_slack/lambda_function.zip"
+  filename = "${path.module}/../sns_to_slack.zip"
 
   environment {
     variables = {
       SLACK_WEBHOOK_URL = var.slack_webhook_url
+      NEWS_BUCKET_NAME  = aws_s3_bucket.news_bucket.bucket
     }
   }
 }
@@ -27,6 +27,18 @@ variable "deploy_sns_to_slack" {
   default     = false
 }
 
+variable "enable_sqs_pipeline" {
+  description = "Whether the collector fans new articles out to the processor through SQS"
+  type        = bool
+  default     = false
+}
+
+variable "sqs_max_concurrency" {
+  description = "Maximum concurrent processor invocations for the SQS pipeline (at least 2)"
+  type        = number
+  default     = 2
+}
+
 variable "schedule_expression" {
   description = "CloudWatch Events schedule expression"
   type        = string